@@ -12,8 +12,13 @@ class BehaviourCount:
         self.bspace = BehaviourSpace(planningtask, bspace_cfg)
         planlist = [PDDLReader().parse_plan_string(planningtask, plan) for plan in planlist]
         
+        # Simulating the plans is much cheaper than fixing them in the solver.
+        count_method = bspace_cfg.get('behaviour-count-method', 'simulation')
+        assert count_method in ['simulation', 'smt'], f'Unknown behaviour count method {count_method}.'
+        plan_behaviour = self.bspace.simulate_plan_behaviour if count_method == 'simulation' else self.bspace.plan_behaviour
+
         for i, plan in enumerate(planlist):
-            ret = self.bspace.plan_behaviour(plan, i)
+            ret = plan_behaviour(plan, i)
             if ret is None: self.bspace.log_msg.append(f'Plan {i} is not satisfiable.')
 
     def count(self):
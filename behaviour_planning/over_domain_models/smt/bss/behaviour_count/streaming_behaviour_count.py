@@ -0,0 +1,131 @@
+import os
+import tarfile
+import zipfile
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+
+class StreamingBehaviourCount:
+    """!
+    Counts the behaviours of a plan set that is read lazily from a directory or an archive
+    (.tar, .tar.gz, .zip). The plans are scored by a pool of forked workers that share the
+    behaviour space built by this process, and the behaviours' frequencies are merged at the end.
+    """
+    def __init__(self, domain, problem, bspace_cfg, plans_source):
+        self.plans_source = plans_source
+        self.workers      = bspace_cfg.get('workers', os.cpu_count())
+        self.batch_size   = bspace_cfg.get('batch-size', 64)
+        self.log_msg      = []
+        self._behaviour_frequency = Counter()
+
+        planningtask = PDDLReader().parse_problem(domain, problem)
+
+        # A cheap first pass to find the longest plan without parsing the plans, the formula's
+        # last step is empty so it needs one more step.
+        bspace_cfg['upper-bound'] = max([plan_length(plan) for _, plan in read_plans(plans_source)], default=0) + 1
+        assert bspace_cfg['upper-bound'] >= 2, f'No plans found in {plans_source}.'
+
+        self.bspace = BehaviourSpace(planningtask, bspace_cfg)
+        # The workers send back their own messages only.
+        self.log_msg.extend(self.bspace.log_msg)
+        self.bspace.log_msg = []
+        self.score(bspace_cfg.get('behaviour-count-method', 'simulation'))
+
+    def score(self, count_method):
+        batches = read_batches(self.plans_source, self.batch_size)
+        _init_worker(self.bspace, count_method)
+        if self.workers <= 1:
+            for batch in batches: self.merge(_score_batch(batch))
+            return
+
+        # Workers are forked so they share the grounded task and the encodings with this process.
+        mp_context = multiprocessing.get_context('fork')
+        executor   = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context, initializer=_init_worker, initargs=(self.bspace, count_method))
+        try:
+            # Only a bounded window of batches is in flight so the plans are never all in memory.
+            pending = set()
+            for batch in batches:
+                pending.add(executor.submit(_score_batch, batch))
+                if len(pending) < 2*self.workers: continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done: self.merge(future.result())
+            for future in wait(pending).done: self.merge(future.result())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def merge(self, result):
+        behaviour_frequency, log_msg = result
+        self._behaviour_frequency.update(behaviour_frequency)
+        self.log_msg.extend(log_msg)
+
+    def count(self):
+        return len(self._behaviour_frequency.keys())
+
+    def behaviour_frequency(self):
+        return dict(self._behaviour_frequency)
+
+    def logs(self):
+        return self.log_msg
+
+def plan_length(plan):
+    return sum(1 for line in plan.splitlines() if line.strip().startswith('('))
+
+def read_plans(source):
+    """!
+    Lazily yields the (name, plan) pairs found in a directory or an archive.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if not os.path.isfile(path): continue
+            with open(path, 'r') as f:
+                yield name, f.read()
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, 'r:*') as tar:
+            for member in tar:
+                if not member.isfile(): continue
+                yield member.name, tar.extractfile(member).read().decode()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.is_dir(): continue
+                yield info.filename, archive.read(info).decode()
+    else:
+        raise ValueError(f'{source} is neither a directory nor a supported archive.')
+
+def read_batches(source, batch_size):
+    batch = []
+    for name, plan in read_plans(source):
+        batch.append((name, plan))
+        if len(batch) < batch_size: continue
+        yield batch
+        batch = []
+    if len(batch) > 0: yield batch
+
+_worker_state = {}
+
+def _init_worker(bspace, count_method):
+    plan_behaviour = bspace.simulate_plan_behaviour if count_method == 'simulation' else bspace.plan_behaviour
+    _worker_state.update({'bspace': bspace, 'plan-behaviour': plan_behaviour})
+
+def _score_batch(batch):
+    bspace = _worker_state['bspace']
+    for name, plan in batch:
+        try:
+            plan = PDDLReader().parse_plan_string(bspace.task, plan)
+        except Exception as e:
+            bspace.log_msg.append(f'Plan {name} could not be parsed: {e}')
+            continue
+        if _worker_state['plan-behaviour'](plan, name) is None:
+            bspace.log_msg.append(f'Plan {name} is not satisfiable.')
+    # Only the batch's behaviours are sent back, then the worker forgets them to keep its memory flat.
+    # The behaviours' ids are local to the worker, so they are sent as signatures.
+    behaviour_frequency = Counter({bspace.behaviour_signature(b): f for b, f in bspace._behaviour_frequency.items()})
+    result = (behaviour_frequency, bspace.log_msg)
+    bspace._behaviour_frequency.clear()
+    bspace.log_msg  = []
+    return result
@@ -0,0 +1,104 @@
+import z3
+
+from z3 import ModelRef
+
+from unified_planning.model.metrics import MinimizeActionCosts
+from pypmt.encoders.utilities import str_repr
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.simulated_plan import SimulatedPlan
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.base import DimensionConstructor
+
+class ActionCost(DimensionConstructor):
+    """!
+    The plan's cost under the problem's MinimizeActionCosts metric, discretised into buckets.
+    The buckets are given by their lower bounds in additional_information['cost-buckets'], or
+    by additional_information['buckets'] (default 5) equal-width buckets up to the highest cost
+    the horizon allows. Every bucket bound is a weighted pseudo-Boolean constraint over the
+    actions of all steps and the dimension's value is the number of bounds the plan reaches.
+    """
+    def __init__(self, encoder, additional_information):
+        additional_information = additional_information or {}
+        self.actions_costs = actions_costs(encoder)
+        self.cost_buckets  = additional_information.get('cost-buckets', None)
+        self.buckets_count = additional_information.get('buckets', 5)
+        self.buckets_vars  = []
+        super().__init__('action-cost', encoder, additional_information)
+
+    def __encode__(self, encoder):
+        if self.cost_buckets is None:
+            max_cost = len(encoder) * max(list(self.actions_costs.values()) + [1])
+            bucket_size = max(1, -(-max_cost // self.buckets_count))
+            self.cost_buckets = list(range(bucket_size, max_cost+1, bucket_size))
+        self.cost_buckets = sorted(set(self.cost_buckets))
+
+        weighted_actions = []
+        for t in range(0, len(encoder)):
+            weighted_actions += [(encoder.up_actions_to_z3[action][t], cost) for action, cost in self.actions_costs.items() if cost > 0]
+
+        self.var = z3.Int(self.name, ctx=encoder.ctx)
+        for bound in self.cost_buckets:
+            bucket_var = z3.Bool(f'{self.name}>={bound}', ctx=encoder.ctx)
+            self.encodings.append(bucket_var == (z3.PbGe(weighted_actions, bound) if len(weighted_actions) > 0 else z3.BoolVal(False, ctx=encoder.ctx)))
+            self.buckets_vars.append(bucket_var)
+        # The bucket literals are ordered, so the value is the number of them that hold.
+        for lower, upper in zip(self.buckets_vars, self.buckets_vars[1:]):
+            self.encodings.append(z3.Implies(upper, lower))
+        self.encodings.append(self.var == z3.Sum([z3.If(b, z3.IntVal(1, ctx=encoder.ctx), z3.IntVal(0, ctx=encoder.ctx)) for b in self.buckets_vars] + \
+                                                 [z3.IntVal(0, ctx=encoder.ctx)]))
+        # The bounds are implied, but they let finite domain solvers bit-blast the value.
+        self.encodings.append(z3.And(self.var >= z3.IntVal(0, ctx=encoder.ctx), self.var <= z3.IntVal(len(self.buckets_vars), ctx=encoder.ctx)))
+
+    def value(self, plan):
+        retvalue = None
+        if isinstance(plan, ModelRef):
+            retvalue = plan.evaluate(self.var, model_completion = True)
+        elif isinstance(plan, SimulatedPlan):
+            cost = sum(self.actions_costs.get(plan.encoder._up_actionname_to_z3(a), 0) for a in plan.actions)
+            retvalue = z3.IntVal(self.bucket(cost), ctx=plan.encoder.ctx)
+        else:
+            raise TypeError(f"Unknown type for plan: {type(plan)}")
+        self.var_domain.add(str(retvalue))
+        return retvalue
+
+    def bucket(self, cost):
+        return len([bound for bound in self.cost_buckets if cost >= bound])
+
+    def dump_state(self):
+        state = super().dump_state()
+        state['actions-costs'] = self.actions_costs
+        state['cost-buckets']  = self.cost_buckets
+        return state
+
+    def load_state(self, encoder, additional_information, state):
+        super().load_state(encoder, additional_information, state)
+        self.actions_costs = state['actions-costs']
+        self.cost_buckets  = state['cost-buckets']
+        self.buckets_count = len(self.cost_buckets)
+        self.buckets_vars  = []
+
+    def partition(self):
+        return list(range(0, len(self.cost_buckets)+1))
+
+    def discretize(self, value):
+        return value.as_long()
+
+def actions_costs(encoder):
+    """!
+    Returns the cost of every grounded action under the MinimizeActionCosts metric of the
+    grounded problem. The costs have to be integers, they are the weights of PB constraints.
+    """
+    metrics = [m for m in encoder.ground_problem.quality_metrics if isinstance(m, MinimizeActionCosts)]
+    assert len(metrics) > 0, 'The action cost dimension requires a problem with a MinimizeActionCosts metric.'
+    metric = metrics[0]
+
+    costs = {}
+    for grounded_action in encoder.ground_problem.actions:
+        cost = metric.get_action_cost(grounded_action)
+        if cost is None: cost = 0
+        # Costs given by static fluents are evaluated on the initial state.
+        elif not cost.is_constant():
+            cost = cost.substitute(encoder.ground_problem.initial_values).simplify()
+        cost = cost if isinstance(cost, int) else cost.constant_value()
+        assert float(cost).is_integer() and cost >= 0, f'The cost of {grounded_action.name} is not a non-negative integer: {cost}.'
+        costs[str_repr(grounded_action)] = int(cost)
+    return costs
@@ -1,5 +1,7 @@
 from collections import defaultdict
 
+import z3
+
 class DimensionConstructor:
     def __init__(self, name, encoder, additional_information):
         self.name = name
@@ -32,5 +34,72 @@ class DimensionConstructor:
         """
         raise NotImplementedError
     
+    def partition(self):
+        """!
+        This function should return the values that partition the domain of the dimension
+        into disjoint cubes, or an empty list if the dimension cannot be partitioned.
+        """
+        return []
+
+    def cube_expression(self, value):
+        """!
+        This function should return the expression restricting the dimension to one of the 
+        values returned by partition.
+        """
+        return self.var == value
+
+    @classmethod
+    def restore(cls, encoder, additional_information, state):
+        """!
+        Rebuilds the dimension from the state returned by dump_state without encoding it.
+        """
+        dim = cls.__new__(cls)
+        dim.load_state(encoder, additional_information, state)
+        return dim
+
+    def dump_state(self):
+        """!
+        This function should return the (JSON serialisable) state needed to use the dimension 
+        without encoding it again.
+        """
+        return {'name': self.name, 'var': dump_var(self.var)}
+
+    def load_state(self, encoder, additional_information, state):
+        self.name = state['name']
+        self.additional_information = additional_information
+        self.var  = load_var(state['var'], encoder.ctx)
+        self.encoder_function = defaultdict(dict)
+        self.var_domain = set()
+        self.encodings = []
+
+    def signature(self, plan):
+        """!
+        Returns the discretized value of the dimension as a (hashable) python value, the 
+        behaviour space identifies behaviours by the dimensions' signatures.
+        """
+        return python_value(self.discretize(self.value(plan)))
+
+    def signature_expression(self, value):
+        """!
+        This function should return the expression restricting the dimension to a value 
+        returned by signature.
+        """
+        return self.var == value
+
     def behaviour_expression(self, plan):
-        return self.var == self.discretize(self.value(plan))
\ No newline at end of file
+        return self.signature_expression(self.signature(plan))
+
+def python_value(value):
+    if z3.is_int_value(value): return value.as_long()
+    if z3.is_true(value):      return True
+    if z3.is_false(value):     return False
+    return value
+
+def dump_var(var):
+    if var is None: return None
+    return {'name': var.decl().name(), 'sort': str(var.sort())}
+
+def load_var(var, ctx):
+    if var is None: return None
+    sorts = {'Int': z3.IntSort, 'Bool': z3.BoolSort}
+    return z3.Const(var['name'], sorts[var['sort']](ctx=ctx))
\ No newline at end of file
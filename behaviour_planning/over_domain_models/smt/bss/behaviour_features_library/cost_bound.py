@@ -12,12 +12,20 @@ class CostBound(DimensionConstructor):
     def __encode__(self, encoder):
         self.actions_cost = z3.Int(self.name, ctx=encoder.ctx)
         self.var        = self.actions_cost
+        self.max_cost   = len(encoder)
+        # 'sum' encodes the dimension over the actions of every step, 'chain' over one activity
+        # literal per step.
+        self.encoding   = (self.additional_information or {}).get('encoding', 'sum')
+        assert self.encoding in ['chain', 'sum'], f'Unknown cost bound encoding {self.encoding}.'
+        if self.encoding == 'chain':
+            self.encode_chain(encoder)
+        else:
+            self.encode_sum(encoder)
 
+    def encode_sum(self, encoder):
         all_actions    = []
         for t in range(0, len(encoder)):
-            self.actions_costs_vars[t] = [z3.If(a, z3.IntVal(self.action_cost_fn(a), ctx=encoder.ctx), \
-                                                   z3.IntVal(0, ctx=encoder.ctx)) \
-                                        for a in encoder.get_actions_vars(t)]
+            self.actions_costs_vars[t] = self.step_costs(encoder, t)
             all_actions += self.actions_costs_vars[t]
         
         self.encodings.append(self.actions_cost == z3.Sum(all_actions))
@@ -27,7 +35,56 @@ class CostBound(DimensionConstructor):
         for t in range(1, len(encoder)):
             self.encodings.append(z3.Implies(z3.Or(encoder.get_actions_vars(t)), \
                                              z3.PbEq([(a, 1) for a in encoder.get_actions_vars(t-1)], 1)))
-    
+
+    def encode_chain(self, encoder):
+        """!
+        Step t is active if one of its actions is executed. The execution semantics allow at most
+        one action per step, so an active step needs an active previous step, and with unit costs
+        the cost is the number of active steps.
+        """
+        self.steps_active_vars = []
+        for t in range(0, len(encoder)):
+            step_active_var = z3.Bool(f'{self.name}-step-{t}-active', ctx=encoder.ctx)
+            self.encodings.append(step_active_var == z3.Or(encoder.get_actions_vars(t)))
+            self.steps_active_vars.append(step_active_var)
+
+        if all(self.action_cost_fn(a) == 1 for a in encoder.get_actions_vars(0)):
+            all_actions = [z3.If(a, z3.IntVal(1, ctx=encoder.ctx), z3.IntVal(0, ctx=encoder.ctx)) for a in self.steps_active_vars]
+        else:
+            all_actions = []
+            for t in range(0, len(encoder)):
+                self.actions_costs_vars[t] = self.step_costs(encoder, t)
+                all_actions += self.actions_costs_vars[t]
+
+        self.encodings.append(self.actions_cost == z3.Sum(all_actions))
+        self.encodings.append(self.actions_cost >  z3.IntVal(0, ctx=encoder.ctx))
+        self.encodings.append(self.actions_cost <= z3.IntVal(len(encoder), ctx=encoder.ctx))
+
+        for t in range(1, len(encoder)):
+            self.encodings.append(z3.Implies(self.steps_active_vars[t], self.steps_active_vars[t-1]))
+
+    def step_costs(self, encoder, t):
+        return [z3.If(a, z3.IntVal(self.action_cost_fn(a), ctx=encoder.ctx), \
+                         z3.IntVal(0, ctx=encoder.ctx)) \
+                for a in encoder.get_actions_vars(t)]
+
+    def dump_state(self):
+        state = super().dump_state()
+        state['max-cost'] = self.max_cost
+        state['encoding'] = self.encoding
+        return state
+
+    def load_state(self, encoder, additional_information, state):
+        super().load_state(encoder, additional_information, state)
+        self.actions_cost       = self.var
+        self.actions_costs_vars = defaultdict(dict)
+        self.max_cost           = state['max-cost']
+        self.encoding           = state.get('encoding', 'sum')
+        self.steps_active_vars  = []
+
+    def partition(self):
+        return list(range(1, self.max_cost+1))
+
     def discretize(self, value):
         return value.as_long()
     
@@ -1,34 +1,56 @@
 from collections import defaultdict
+from itertools import product
 
 import z3
 from z3 import ModelRef
-from unified_planning.plans import SequentialPlan
 
-from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.base import DimensionConstructor
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.simulated_plan import SimulatedPlan
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.base import DimensionConstructor, dump_var, load_var
 
 class GoalPredicatesOrdering(DimensionConstructor):
     
     def __init__(self, encoder, additional_information):
         self.goal_predciates_vars = []
+        self.subgoals_vars = []
         self.dummy_goal_variable = z3.Bool('dummy-goal-variable', ctx=encoder.ctx)
         self.dummy_goal_expression = self.dummy_goal_variable == z3.BoolVal(False, ctx=encoder.ctx)
+        self.partition_vars_count  = (additional_information or {}).get('partition-vars', 3)
+        # 'uf' orders the subgoals through integer variables and an uninterpreted function,
+        # 'precedence' through Boolean literals over the subgoals' first achievement steps.
+        self.encoding = (additional_information or {}).get('encoding', 'uf')
+        assert self.encoding in ['uf', 'precedence'], f'Unknown goal ordering encoding {self.encoding}.'
         super().__init__('goal-predicates-ordering', encoder, additional_information)
 
     def __encode__(self, encoder):
         """!
         This function should return the encoding of the dimension.
         """
+        self.subgoals_vars = self.collect_subgoals(encoder)
+
+        if self.encoding == 'precedence':
+            self.encode_precedence(encoder)
+        else:
+            self.encode_uf(encoder)
+
+    def collect_subgoals(self, encoder):
+        """!
+        Returns the predicates of every subgoal, one per step, from the encoder's goal states.
+        """
         subgoals_list_vars = defaultdict(dict)
         for goal in encoder.goal_states:
             goal = goal.children()[0]
             for idx, predicate in enumerate(goal.children()):
                 if not idx in subgoals_list_vars: subgoals_list_vars[idx] = []
                 subgoals_list_vars[idx].append(predicate)
+        return list(subgoals_list_vars.values())
+
+    def subgoal_name(self, sgo_vars_list):
+        return str(sgo_vars_list[0])[:str(sgo_vars_list[0]).rfind('_')]
 
+    def encode_uf(self, encoder):
         _sgo_z3_vars = []
-        for _, sgo_vars_list in subgoals_list_vars.items():
-            sgnoname = str(sgo_vars_list[0])[:str(sgo_vars_list[0]).rfind('_')]
-            subgoal_z3_var = z3.Int(f'sgo-{sgnoname}', ctx=encoder.ctx)
+        for sgo_vars_list in self.subgoals_vars:
+            subgoal_z3_var = z3.Int(f'sgo-{self.subgoal_name(sgo_vars_list)}', ctx=encoder.ctx)
             _sgo_z3_vars.append(subgoal_z3_var)
             for idx, sgo in enumerate(sgo_vars_list):
                 expr  = [sgo] + [z3.Not(sgo, ctx=encoder.ctx) for sgo in sgo_vars_list[:idx]]
@@ -45,27 +67,139 @@ class GoalPredicatesOrdering(DimensionConstructor):
                 self.encodings.append(ordering_var == uf_gt(sgoi, sgoj))
                 self.goal_predciates_vars.append(ordering_var)
 
+    def encode_precedence(self, encoder):
+        """!
+        The same orderings as encode_uf with Boolean literals only. achieved[i][t] holds if the
+        subgoal i holds in one of the states 1..t+1, i.e., its first achievement step is at most t+1.
+        The ordering literal of (i, j) holds if sgo_i >= sgo_j, where a subgoal that is never
+        achieved is ordered before all the others (sgo = -100 in encode_uf).
+        """
+        achieved = []
+        for sgo_vars_list in self.subgoals_vars:
+            sgname = self.subgoal_name(sgo_vars_list)
+            chain  = []
+            for idx, sgo in enumerate(sgo_vars_list):
+                achieved_var = z3.Bool(f'sgo-{sgname}-achieved-{idx+1}', ctx=encoder.ctx)
+                self.encodings.append(achieved_var == (z3.Or(chain[-1], sgo) if idx > 0 else sgo))
+                chain.append(achieved_var)
+            achieved.append(chain)
+
+        for i, achieved_i in enumerate(achieved):
+            for j, achieved_j in enumerate(achieved[i+1:], start=i+1):
+                # sgo_i < sgo_j: j is achieved and i is either never achieved or achieved at a step where j is not.
+                achieved_i_first = z3.Or([z3.And(ai, z3.Not(aj)) for ai, aj in zip(achieved_i, achieved_j)])
+                i_before_j = z3.And(achieved_j[-1], z3.Or(z3.Not(achieved_i[-1]), achieved_i_first))
+                ordering_var = z3.Bool(f'goal-predicate-ordering-sgo-{self.subgoal_name(self.subgoals_vars[i])}>'
+                                       f'sgo-{self.subgoal_name(self.subgoals_vars[j])}', ctx=encoder.ctx)
+                self.encodings.append(ordering_var == z3.Not(i_before_j))
+                self.goal_predciates_vars.append(ordering_var)
+
     def value(self, plan):
+        """!
+        Returns the values of the ordering variables as a tuple.
+        """
         ret_value = []
-        ret_value_str = []
         if isinstance(plan, ModelRef):
             for predicate in self.goal_predciates_vars:
-                predicate_value = plan.evaluate(predicate, model_completion = True)
-                ret_value.append(predicate == predicate_value)
-                ret_value_str.append(str(predicate_value.as_long()))
-        elif isinstance(plan, SequentialPlan):
-            assert False, 'Value function is not implemented for this dimension for a plan.'
+                ordering = plan.evaluate(predicate, model_completion = True)
+                ret_value.append((1 if z3.is_true(ordering) else 0) if z3.is_bool(predicate) else ordering.as_long())
+        elif isinstance(plan, SimulatedPlan):
+            if len(self.subgoals_vars) == 0 and len(self.goal_predciates_vars) > 0:
+                raise NotImplementedError('The subgoals are not known for a restored dimension.')
+            sgo_values = [self.subgoal_order(sgo_vars_list, plan) for sgo_vars_list in self.subgoals_vars]
+            for i, sgoi in enumerate(sgo_values):
+                for sgoj in sgo_values[i+1:]:
+                    ret_value.append(1 if sgoi >= sgoj else 0)
         else:
             raise TypeError(f"Unknown type for plan: {type(plan)}")
-        self.var_domain.add(''.join(ret_value_str))
-        if len(ret_value) == 0: ret_value.append(self.dummy_goal_expression)
-        return z3.And(ret_value)
+        self.var_domain.add(''.join(map(str, ret_value)))
+        return tuple(ret_value)
+
+    def subgoal_order(self, sgo_vars_list, plan):
+        """!
+        Mirrors the encoding of the sgo variables: the first state where the subgoal holds,
+        or -100 if it does not hold in any state.
+        """
+        for idx, sgo in enumerate(sgo_vars_list):
+            if self.holds(sgo, plan.state(idx+1), plan.encoder): return idx+1
+        return -100
+
+    def holds(self, predicate, state, encoder):
+        if z3.is_not(predicate):
+            return not self.holds(predicate.arg(0), state, encoder)
+        if z3.is_const(predicate) and z3.is_bool(predicate):
+            fluent = encoder.get_fluent_expression(predicate)
+            if fluent is not None: return state.get_value(fluent).bool_constant_value()
+        # Numeric (or compound) subgoals: the fluents are replaced by their values in the state.
+        values = [(var, state_value(var, state, encoder)) for var in fluents_vars(predicate)]
+        if any(value is None for _, value in values):
+            raise NotImplementedError(f'Cannot evaluate the subgoal {predicate} on a state.')
+        return z3.is_true(z3.simplify(z3.substitute(predicate, values)))
+
+    def dump_state(self):
+        state = super().dump_state()
+        state['goal-predicates-vars'] = [dump_var(v) for v in self.goal_predciates_vars]
+        state['encoding'] = self.encoding
+        return state
+
+    def load_state(self, encoder, additional_information, state):
+        super().load_state(encoder, additional_information, state)
+        self.goal_predciates_vars  = [load_var(v, encoder.ctx) for v in state['goal-predicates-vars']]
+        # The encodings cache restores the goal states, so the subgoals can be simulated.
+        self.subgoals_vars         = self.collect_subgoals(encoder)
+        self.dummy_goal_variable   = z3.Bool('dummy-goal-variable', ctx=encoder.ctx)
+        self.dummy_goal_expression = self.dummy_goal_variable == z3.BoolVal(False, ctx=encoder.ctx)
+        self.partition_vars_count  = (additional_information or {}).get('partition-vars', 3)
+        self.encoding              = state.get('encoding', 'uf')
+
+    def partition(self):
+        """!
+        The orderings of the first few pairs of subgoals, each ordering variable is either 0 or 1.
+        """
+        partition_vars_count = min(len(self.goal_predciates_vars), self.partition_vars_count)
+        return list(product([0, 1], repeat=partition_vars_count)) if partition_vars_count > 0 else []
+
+    def cube_expression(self, value):
+        return z3.And([self.ordering_expression(var, v) for var, v in zip(self.goal_predciates_vars, value)])
+
+    def ordering_expression(self, var, value):
+        if z3.is_bool(var): return var if value == 1 else z3.Not(var)
+        return var == z3.IntVal(value, ctx=var.ctx)
 
     def discretize(self, value):
         """!
         This function should return the discretized value of the dimension.
         """
         return value
-    
-    def behaviour_expression(self, plan):
-        return self.discretize(self.value(plan))
+
+    def signature_expression(self, value):
+        if len(value) == 0: return self.dummy_goal_expression
+        return self.cube_expression(value)
+
+def fluents_vars(expr):
+    """!
+    Returns the uninterpreted constants (the fluents) of an expression.
+    """
+    consts, stack, seen = [], [expr], set()
+    while len(stack) > 0:
+        e = stack.pop()
+        if e.get_id() in seen: continue
+        seen.add(e.get_id())
+        if z3.is_const(e) and e.decl().kind() == z3.Z3_OP_UNINTERPRETED: consts.append(e)
+        else: stack.extend(e.children())
+    return consts
+
+def state_value(var, state, encoder):
+    """!
+    Returns the z3 value of a fluent variable in a UP state, or None if it is not a fluent.
+    """
+    fluent = encoder.get_fluent_expression(var)
+    if fluent is None: return None
+    value = state.get_value(fluent)
+    if value.is_bool_constant(): return z3.BoolVal(value.bool_constant_value(), ctx=var.ctx)
+    if value.is_int_constant() or value.is_real_constant():
+        number = value.constant_value()
+        # The value must have the variable's sort (e.g., an integer value of a real fluent).
+        if z3.is_int(var): return z3.IntVal(int(number), ctx=var.ctx)
+        if z3.is_real(var): return z3.RealVal(f'{number.numerator}/{number.denominator}', ctx=var.ctx)
+    return None
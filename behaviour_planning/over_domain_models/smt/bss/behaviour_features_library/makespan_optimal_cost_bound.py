@@ -2,8 +2,8 @@ from collections import defaultdict
 import z3
 
 from z3 import ModelRef
-from unified_planning.plans import SequentialPlan
 
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.simulated_plan import SimulatedPlan
 from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.cost_bound import CostBound
 
 class MakespanOptimalCostBound(CostBound):
@@ -17,20 +17,42 @@ class MakespanOptimalCostBound(CostBound):
 
         if self.disable_action_check: return
 
-        # TODO: we need to find a quick way to encode the makespan.
+        if self.encoding == 'chain':
+            self.encode_done_chain(encoder)
+            return
+
         for t, goal_state in enumerate(encoder.goal_states):
             # Can we do this with setting the actions to False?!
             after_goal_state_actions = []
             for t2 in range(t+1, len(encoder)):
                 after_goal_state_actions.extend(self.actions_costs_vars[t2])
             self.encodings.append(goal_state == (z3.Sum(after_goal_state_actions) == z3.IntVal(0, ctx=encoder.ctx)))
+
+    def encode_done_chain(self, encoder):
+        """!
+        The plan is done by step t if no action is executed at steps t..T-1, every done literal
+        is defined by the next one. The goal holds after step t iff the plan is done by step t+1.
+        """
+        done_vars = [z3.BoolVal(True, ctx=encoder.ctx)]
+        for t in reversed(range(0, len(encoder))):
+            done_var = z3.Bool(f'{self.name}-done-{t}', ctx=encoder.ctx)
+            self.encodings.append(done_var == z3.And(z3.Not(self.steps_active_vars[t]), done_vars[-1]))
+            done_vars.append(done_var)
+        done_vars.reverse()
+        for t, goal_state in enumerate(encoder.goal_states):
+            self.encodings.append(goal_state == done_vars[min(t+1, len(encoder))])
         
+    def load_state(self, encoder, additional_information, state):
+        super().load_state(encoder, additional_information, state)
+        self.disable_action_check = additional_information.get('disable_action_check', False)
+        self.action_cost_fn       = lambda a: 1
+
     def value(self, plan):
         retvalue = None
         if isinstance(plan, ModelRef):
             retvalue = plan.evaluate(self.var, model_completion = True)
-        elif isinstance(plan, SequentialPlan):
-            assert False, 'Value function is not implemented for this dimension for a plan.'
+        elif isinstance(plan, SimulatedPlan):
+            retvalue = z3.IntVal(len(plan.actions), ctx=plan.encoder.ctx)
         else:
             raise TypeError(f"Unknown type for plan: {type(plan)}")
         self.var_domain.add(str(retvalue))
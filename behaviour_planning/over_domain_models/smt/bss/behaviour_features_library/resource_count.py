@@ -2,8 +2,8 @@
 import z3
 
 from z3 import ModelRef
-from unified_planning.plans import SequentialPlan
 
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.simulated_plan import SimulatedPlan
 from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.resources import Resources
 
 class ResourceCount(Resources):
@@ -15,30 +15,44 @@ class ResourceCount(Resources):
         self.resoruces_count = z3.Int(self.name, ctx=encoder.ctx)
         self.var = self.resoruces_count
         
-        resoruce_count_vars = []
-        for resource, actions in self.resources_list.items():
-            # Now create two real variables.
-            actions_count_z3_var = z3.Int(f'actions-count-for-object-{resource}', ctx=encoder.ctx)
-            resource_used_z3_var = z3.Int(f'resource-{resource}-used', ctx=encoder.ctx) 
-            # Add the constraints.
-            self.encodings.append(actions_count_z3_var == z3.Sum(actions))
-            self.encodings.append(resource_used_z3_var == z3.If(actions_count_z3_var > z3.IntVal(0, ctx=encoder.ctx), \
-                                                          z3.IntVal(1, ctx=encoder.ctx), z3.IntVal(0, ctx=encoder.ctx), \
-                                                          ctx=encoder.ctx))
-            resoruce_count_vars.append(resource_used_z3_var)
-
-        self.encodings.append(self.resoruces_count == z3.Sum(resoruce_count_vars))
+        # A resource is used if any of its actions is executed at any step, the count sums those
+        # disjunctions directly so no auxiliary integers are created per resource.
+        resoruce_used_vars = [z3.If(z3.Or(actions), z3.IntVal(1, ctx=encoder.ctx), z3.IntVal(0, ctx=encoder.ctx), ctx=encoder.ctx) \
+                              for resource, actions in self.resources_list.items()]
+        self.encodings.append(self.resoruces_count == z3.Sum(resoruce_used_vars) if len(resoruce_used_vars) > 0 \
+                              else self.resoruces_count == z3.IntVal(0, ctx=encoder.ctx))
+        # The bounds are implied, but they let finite domain solvers bit-blast the count.
+        self.encodings.append(z3.And(self.resoruces_count >= z3.IntVal(0, ctx=encoder.ctx), \
+                                     self.resoruces_count <= z3.IntVal(len(resoruce_used_vars), ctx=encoder.ctx)))
 
     def value(self, plan):
         retvalue = None
         if isinstance(plan, ModelRef):
             retvalue = plan.evaluate(self.var, model_completion = True)
-        elif isinstance(plan, SequentialPlan):
-            assert False, 'Value function is not implemented for this dimension for a plan.'
+        elif isinstance(plan, SimulatedPlan):
+            # A resource is used if any of its actions is in the plan.
+            plan_actions = set(plan.encoder._up_actionname_to_z3(a) for a in plan.actions)
+            used_resources = [r for r, actions in self.resources_actions.items() if len(actions & plan_actions) > 0]
+            retvalue = z3.IntVal(len(used_resources), ctx=plan.encoder.ctx)
         else:
             raise TypeError(f"Unknown type for plan: {type(plan)}")
         self.var_domain.add(str(retvalue))
         return retvalue
 
+    def dump_state(self):
+        state = super().dump_state()
+        state['resources'] = {r: sorted(self.resources_actions[r]) for r in self.resources_list.keys()}
+        return state
+
+    def load_state(self, encoder, additional_information, state):
+        super().load_state(encoder, additional_information, state)
+        self.resoruces_count = self.var
+        # The z3 terms of the resources are only needed to encode the dimension.
+        self.resources_list    = {r: [] for r in state['resources']}
+        self.resources_actions = {r: set(actions) for r, actions in state['resources'].items()}
+
+    def partition(self):
+        return list(range(0, len(self.resources_list)+1))
+
     def discretize(self, value):
         return value
@@ -1,11 +1,13 @@
 
-from copy import deepcopy
+from array import array
 from collections import defaultdict
 
 import z3
+from z3 import z3core
 
 from unified_planning.plans import SequentialPlan
 from unified_planning.plans import ActionInstance
+from unified_planning.shortcuts import SequentialSimulator
 
 from pypmt.encoders.basic import EncoderSequential
 from pypmt.encoders.utilities import str_repr
@@ -14,6 +16,36 @@ from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encod
 
 # append some extra functions to the EncoderSequential.
 
+_encoder_sequential_init = EncoderSequential.__init__
+
+def __init__(self, *args, **kwargs):
+    """!
+    The encoder's state must belong to the instance, otherwise every encoder in the process
+    appends to the same lists and none of them can be freed.
+    """
+    # Store action to number map.
+    self.action_name_to_number = defaultdict(dict)
+    # Store all goal states.
+    self.goal_states = []
+    # Store all assertions.
+    self.assertions  = []
+    _encoder_sequential_init(self, *args, **kwargs)
+
+def close(self):
+    """!
+    Drops the encoder's formulas, tables and z3 context so they can be freed.
+    """
+    for attr in ['formula', 'step_template', 'step_template_vars', 'step_actions_vars', 'step_fluents_vars',
+                 'simulator', 'grounded_actions', 'z3_fluent_to_up', 'action_parameters_index',
+                 'actions_keys', 'actions_vars_index', 'mapped_back_actions']:
+        if hasattr(self, attr): setattr(self, attr, None)
+    self.up_actions_to_z3 = defaultdict(dict)
+    self.up_fluent_to_z3  = defaultdict(dict)
+    self.action_name_to_number = defaultdict(dict)
+    self.goal_states = []
+    self.assertions  = []
+    self.ctx = None
+
 def encode_step(self, t):
     """!
     Builds and returns the formulas for a single transition step (from t to t+1).
@@ -22,31 +54,42 @@ def encode_step(self, t):
     """
     if t == 0:
         self.base_encode()
-        return deepcopy(self.formula)
+        self.compile_step_template()
+        return dict(self.formula)
     
     self.create_variables(t+1) # we create another layer
 
-    list_substitutions = [] # list of pairs (from,to)
-    for key in self.up_actions_to_z3.keys():
-        list_substitutions.append(
-            (self.up_actions_to_z3[key][0],
-                self.up_actions_to_z3[key][t]))
-    for key in self.up_fluent_to_z3.keys():
-        list_substitutions.append(
-            (self.up_fluent_to_z3[key][0],
-                self.up_fluent_to_z3[key][t]))
-        list_substitutions.append(
-            (self.up_fluent_to_z3[key][1],
-                self.up_fluent_to_z3[key][t + 1]))
+    # One substitution over the whole step template, its children are the step's formulas.
+    list_substitutions = list(zip(self.step_template_vars, self.get_step_vars(t)))
+    encoded_step = z3.substitute(self.step_template, list_substitutions).children()
 
     encoded_formula = dict()
     encoded_formula['initial'] = self.formula['initial'] # TODO not needed?
-    encoded_formula['goal']    = z3.substitute(self.formula['goal'], list_substitutions)
-    encoded_formula['actions'] = z3.substitute(self.formula['actions'], list_substitutions)
-    encoded_formula['frame']   = z3.substitute(self.formula['frame'], list_substitutions)
-    encoded_formula['sem']     = z3.substitute(self.formula['sem'], list_substitutions)
+    encoded_formula.update(zip(self.step_template_keys, encoded_step))
+    # The execution semantics are encoded separately for every step.
+    encoded_formula['sem'] = None
     return encoded_formula
 
+def compile_step_template(self):
+    """!
+    Precompiles the formula of the first step into a template for the other steps:
+    the variables of the first step and the tables used to look up the variables of a step.
+    """
+    self.step_template_keys = ['goal', 'actions', 'frame']
+    self.step_template      = z3.And([self.formula[k] for k in self.step_template_keys])
+    self.step_actions_vars  = list(self.up_actions_to_z3.values())
+    self.step_fluents_vars  = list(self.up_fluent_to_z3.values())
+    self.step_template_vars = self.get_step_vars(0)
+
+def get_step_vars(self, t):
+    """!
+    Returns the variables of step t in the template's order: the actions at t, the fluents at t
+    and the fluents at t+1.
+    """
+    return [a[t] for a in self.step_actions_vars] + \
+           [f[t] for f in self.step_fluents_vars] + \
+           [f[t+1] for f in self.step_fluents_vars]
+
 def encode(self, formula_length):
     """!
     This method encodes a formula into a list of assertions.
@@ -69,32 +112,50 @@ def encode(self, formula_length):
     Returns:
     list: The list of assertions resulting from the encoding.
     """
-    for t in range(0, formula_length):
-        formula = self.encode_step(t)
-        self.goal_states.append(formula['goal'])
-        if t == 0: self.assertions.append(formula['initial'])
-        del formula['goal']
-        del formula['initial']
-        del formula['sem']
-        if 'objective' in formula: del formula['objective']
-        for k, v in formula.items():
-            if v is not None: self.assertions.append(v)
+    self.encode_steps(0, formula_length)
     
     # Add the extection sematics.
     for t in range(0, self.formula_length):
-        actions = list(map(lambda x: x[t], self.up_actions_to_z3.values()))
         # Disable the actions in the last step of the formula.
-        execution_semantics = None
-        if t == self.formula_length-1:
-            execution_semantics = z3.PbEq([(var, 1) for var in actions], 0, ctx=self.ctx) 
-        else:
-            execution_semantics = z3.PbLe([(var, 1) for var in actions], 1)
-        self.assertions.append(execution_semantics)
+        self.assertions.append(self.encode_step_execution_semantics(t, t == self.formula_length-1))
     
     # Encode possible goal states.
-    self.assertions.append(z3.PbGe([(g,1) for g in self.goal_states], 1))
+    self.assertions.append(self.encode_goal_disjunction())
     return self.assertions
 
+def encode_steps(self, start, end):
+    """!
+    Encodes the transition steps in [start, end) and appends them to the assertions list.
+    The goal state of every step is appended to goal_states but the goal disjunction is not encoded.
+
+    @return assertions: The list of assertions added for those steps.
+    """
+    step_assertions = []
+    for t in range(start, end):
+        formula = self.encode_step(t)
+        self.goal_states.append(formula['goal'])
+        if t == 0: step_assertions.append(formula['initial'])
+        del formula['goal']
+        del formula['initial']
+        del formula['sem']
+        if 'objective' in formula: del formula['objective']
+        for k, v in formula.items():
+            if v is not None: step_assertions.append(v)
+    self.assertions.extend(step_assertions)
+    return step_assertions
+
+def encode_step_execution_semantics(self, t, is_last_step):
+    """!
+    At most one action is executed per step and no action is executed in the last step.
+    """
+    actions = self.get_actions_vars(t)
+    if is_last_step:
+        return z3.PbEq([(var, 1) for var in actions], 0, ctx=self.ctx)
+    return z3.PbLe([(var, 1) for var in actions], 1)
+
+def encode_goal_disjunction(self):
+    return z3.PbGe([(g,1) for g in self.goal_states], 1)
+
 def get_actions_vars(self, step):
     return list(map(lambda x: x[step], self.up_actions_to_z3.values()))
 
@@ -107,22 +168,143 @@ def convert(self, plan):
 def _up_actionname_to_z3(self, action_name):
     return f'{(str(action_name).replace("(","_").replace(")","").replace(", ", "_"))}'
 
+def simulate(self, plan):
+    """!
+    Simulates the plan on the grounded problem without calling the solver.
+    @return states: The states visited by the plan, starting from the initial state, or None
+    if an action is not applicable or the plan does not reach the goal.
+    """
+    if getattr(self, 'simulator', None) is None:
+        self.simulator = SequentialSimulator(problem=self.ground_problem)
+    self.get_grounded_actions()
+    state  = self.simulator.get_initial_state()
+    states = [state]
+    for a in plan.actions:
+        grounded_action = self.grounded_actions.get(self._up_actionname_to_z3(a), None)
+        if grounded_action is None: return None
+        state = self.simulator.apply(state, ActionInstance(grounded_action))
+        if state is None: return None
+        states.append(state)
+    return states if self.simulator.is_goal(state) else None
+
+def get_fluent_expression(self, var):
+    """!
+    Returns the grounded fluent (UP expression) of a z3 fluent variable at any step, or None if
+    the variable is not a fluent.
+    """
+    if getattr(self, 'z3_fluent_to_up', None) is None:
+        self.z3_fluent_to_up = {}
+        for fluent in self.ground_problem.initial_values:
+            key = str_repr(fluent)
+            if key not in self.up_fluent_to_z3: continue
+            for z3_fluent in self.up_fluent_to_z3[key].values():
+                self.z3_fluent_to_up[z3_fluent.decl().name()] = fluent
+    return self.z3_fluent_to_up.get(var.decl().name(), None)
+
+def get_grounded_actions(self):
+    if getattr(self, 'grounded_actions', None) is None:
+        self.grounded_actions = {action.name: action for action in self}
+    return self.grounded_actions
+
+def map_back_action(self, action_name):
+    """!
+    Returns the action instance of the original task for a grounded action (cached), or None
+    if the compilations drop the action.
+    """
+    if getattr(self, 'mapped_back_actions', None) is None: self.mapped_back_actions = {}
+    if not action_name in self.mapped_back_actions:
+        action_instance = ActionInstance(self.get_grounded_actions()[action_name])
+        for compilation_r in reversed(self.compilation_results):
+            if action_instance is None: break
+            action_instance = compilation_r.map_back_action_instance(action_instance)
+        self.mapped_back_actions[action_name] = action_instance
+    return self.mapped_back_actions[action_name]
+
+def get_action_parameters_index(self):
+    """!
+    Returns a map from every object name to the names of the grounded actions that take it as a
+    parameter. The index is built once from the lifted parameters of the grounded actions.
+    """
+    if getattr(self, 'action_parameters_index', None) is None:
+        self.action_parameters_index = defaultdict(set)
+        for action in self:
+            for parameter in self.map_back_action_parameters(action.name):
+                self.action_parameters_index[parameter].add(action.name)
+    return self.action_parameters_index
+
+def map_back_action_parameters(self, action_name):
+    """!
+    Returns the names of the objects a grounded action is applied to. If a compilation drops the
+    action, the parameters of the last action instance it was mapped back to are used (the
+    grounding is mapped back first, so they are the objects of the task).
+    """
+    action_instance = self.map_back_action(action_name)
+    if action_instance is not None: return [str(p) for p in action_instance.actual_parameters]
+    parameters = None
+    action_instance = ActionInstance(self.get_grounded_actions()[action_name])
+    for compilation_r in reversed(self.compilation_results):
+        action_instance = compilation_r.map_back_action_instance(action_instance)
+        if action_instance is None: break
+        parameters = [str(p) for p in action_instance.actual_parameters]
+    assert parameters is not None, f'The grounded action {action_name} could not be mapped back to an action of the task.'
+    return parameters
+
+def get_actions_keys(self):
+    """!
+    Returns the grounded actions' keys, the actions are numbered (from 1) by their index in it.
+    """
+    if getattr(self, 'actions_keys', None) is None:
+        self.actions_keys = list(self.up_actions_to_z3.keys())
+    return self.actions_keys
+
+def get_actions_vars_index(self):
+    """!
+    Returns a map from the name of every action variable to the (1-based) index of its action
+    in actions_keys and its step. The map is built again when new steps are created.
+    """
+    # All the actions have the same steps.
+    steps_count = len(next(iter(self.up_actions_to_z3.values()), {}))
+    if getattr(self, 'actions_vars_index', None) is None or self.actions_vars_index_steps != steps_count:
+        self.actions_vars_index = {}
+        for i, key in enumerate(self.get_actions_keys()):
+            for t, var in self.up_actions_to_z3[key].items():
+                self.actions_vars_index[var.decl().name()] = (i+1, t)
+        self.actions_vars_index_steps = steps_count
+    return self.actions_vars_index
+
+def extract_plan_actions(self, model, horizon):
+    """!
+    Returns the (1-based) indices in actions_keys of the plan's actions and their steps. The
+    model's constants are walked once, the action variables are found by their names and only
+    the true ones are kept. The walk uses z3's C API getters directly, wrapping every constant
+    of the model in z3py objects costs more than the walk itself.
+    """
+    actions_vars_index = self.get_actions_vars_index()
+    ctx, z3_model = model.ctx.ref(), model.model
+    selected = []
+    for i in range(z3core.Z3_model_get_num_consts(ctx, z3_model)):
+        decl = z3core.Z3_model_get_const_decl(ctx, z3_model, i)
+        action_step = actions_vars_index.get(z3core.Z3_get_symbol_string(ctx, z3core.Z3_get_decl_name(ctx, decl)), None)
+        if action_step is None or action_step[1] > horizon: continue
+        if z3core.Z3_get_bool_value(ctx, z3core.Z3_model_get_const_interp(ctx, z3_model, decl)) == z3.Z3_L_TRUE:
+            selected.append(action_step)
+    selected.sort(key=lambda action_step: action_step[1])
+    return array('i', [a for a, _ in selected]), array('i', [t for _, t in selected])
+
 def extract_plan(self, model, horizon):
     plan = SequentialPlan([])
     selected_actions_vars = []
     actions_sequence = []
     if not model: return plan
     ## linearize partial-order plan
-    for t in range(0, horizon+1):
-        for action in self:
-            if z3.is_true(model[self.up_actions_to_z3[action.name][t]]):
-                plan.actions.append(ActionInstance(action))
-                selected_actions_vars.append(self.up_actions_to_z3[action.name][t])
-                actions_sequence.append(self.action_name_to_number[action.name])
-                break
-
-    for compilation_r in reversed(self.compilation_results):
-        plan = plan.replace_action_instances(compilation_r.map_back_action_instance)
+    for action_index, t in zip(*self.extract_plan_actions(model, horizon)):
+        key = self.get_actions_keys()[action_index-1]
+        selected_actions_vars.append(self.up_actions_to_z3[key][t])
+        actions_sequence.append(self.action_name_to_number[key])
+        # The actions of the original task are mapped back once per grounded action.
+        action_instance = self.map_back_action(key)
+        if action_instance is not None:
+            plan.actions.append(ActionInstance(action_instance.action, action_instance.actual_parameters))
 
     return SMTSequentialPlan(plan, self.task, selected_actions_vars, '-'.join(actions_sequence))
 
@@ -164,18 +346,28 @@ def encode_execution_semantics(self):
 
 
 # Update the encoder apis.
-# Store action to number map.
-setattr(EncoderSequential, 'action_name_to_number', defaultdict(dict))
-# Store all goal states.
-setattr(EncoderSequential, 'goal_states', [])
-# Store all assertions.
-setattr(EncoderSequential, 'assertions', [])
+setattr(EncoderSequential, '__init__', __init__)
+setattr(EncoderSequential, 'close', close)
 setattr(EncoderSequential, 'encode', encode)
 setattr(EncoderSequential, 'encode_step', encode_step)
+setattr(EncoderSequential, 'compile_step_template', compile_step_template)
+setattr(EncoderSequential, 'get_step_vars', get_step_vars)
+setattr(EncoderSequential, 'encode_steps', encode_steps)
+setattr(EncoderSequential, 'encode_step_execution_semantics', encode_step_execution_semantics)
+setattr(EncoderSequential, 'encode_goal_disjunction', encode_goal_disjunction)
 setattr(EncoderSequential, 'get_actions_vars', get_actions_vars)
 setattr(EncoderSequential, 'extend', extend)
 setattr(EncoderSequential, 'convert', convert)
 setattr(EncoderSequential, '_up_actionname_to_z3', _up_actionname_to_z3)
 setattr(EncoderSequential, 'extract_plan', extract_plan)
+setattr(EncoderSequential, 'simulate', simulate)
+setattr(EncoderSequential, 'get_fluent_expression', get_fluent_expression)
+setattr(EncoderSequential, 'get_grounded_actions', get_grounded_actions)
+setattr(EncoderSequential, 'map_back_action', map_back_action)
+setattr(EncoderSequential, 'get_action_parameters_index', get_action_parameters_index)
+setattr(EncoderSequential, 'map_back_action_parameters', map_back_action_parameters)
+setattr(EncoderSequential, 'get_actions_keys', get_actions_keys)
+setattr(EncoderSequential, 'get_actions_vars_index', get_actions_vars_index)
+setattr(EncoderSequential, 'extract_plan_actions', extract_plan_actions)
 setattr(EncoderSequential, 'encode_actions', encode_actions)
 setattr(EncoderSequential, 'encode_execution_semantics', encode_execution_semantics)
\ No newline at end of file
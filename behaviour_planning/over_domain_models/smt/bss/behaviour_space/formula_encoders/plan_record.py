@@ -0,0 +1,173 @@
+import os
+import hashlib
+import weakref
+import tempfile
+import threading
+from array import array
+
+from unified_planning.plans import SequentialPlan, ActionInstance
+
+class PlanRecord:
+    """!
+    A compact plan of a behaviour space. Its body is a single integer array with the (1-based)
+    indices of its actions in the encoder's actions_keys followed by their steps, and its
+    behaviour is the space's integer id. The UP plan and the z3 blocking literals are rebuilt
+    by the space's PlanStore when they are needed. The record holds no z3 or UP objects, so it
+    can be pickled and sent to other processes (without its store).
+    """
+    __slots__ = ('id', 'behaviour', 'isvalid', 'validation_fail_reason', 'reason', 'body', 'length', 'spill_offset', 'store')
+
+    def __init__(self, actions, steps, store=None):
+        assert len(actions) == len(steps), 'Every action needs a step.'
+        self.id        = None
+        self.behaviour = None
+        self.isvalid   = None
+        self.validation_fail_reason = None
+        self.reason    = None
+        self.body      = array('i', actions) + array('i', steps)
+        self.length    = len(actions)
+        self.spill_offset = None
+        self.store     = store
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return str(self.plan)
+
+    def get_body(self):
+        # Read the slot once, the record may be spilled meanwhile by another thread.
+        body = self.body
+        return body if body is not None else self.store.load(self)
+
+    @property
+    def actions(self):
+        return self.get_body()[:self.length]
+
+    @property
+    def steps(self):
+        return self.get_body()[self.length:]
+
+    @property
+    def actions_sequence(self):
+        return '-'.join(map(str, self.actions))
+
+    @property
+    def actions_digest(self):
+        # A fixed-size key of the actions to tell repeated plans apart without keeping a string per plan.
+        return hashlib.blake2b(self.actions.tobytes(), digest_size=16).digest()
+
+    @property
+    def plan(self):
+        return self.store.up_plan(self)
+
+    @property
+    def task(self):
+        return self.store.task
+
+    @property
+    def _z3_plan(self):
+        return self.store.z3_plan(self)
+
+    def __getstate__(self):
+        state = {slot: getattr(self, slot) for slot in self.__slots__ if slot != 'store'}
+        # The receiver has no access to the spill file.
+        state['body'] = self.get_body()
+        state['spill_offset'] = None
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items(): setattr(self, slot, value)
+        self.store = None
+
+class PlanStore:
+    """!
+    Builds and keeps the plan records of a behaviour space. The grounded actions of the records
+    are mapped back to the task once, so the records' UP plans can still be built after the
+    encoder is closed. With a spill directory, the records' bodies can be written to a file and
+    dropped from memory (e.g., once their blocking clauses are asserted), they are read back on
+    demand.
+    """
+    def __init__(self, task, encoder, spill_dir=None):
+        self.task    = task
+        self.encoder = encoder
+        # The mapped back action of every grounded action found in a plan, by its index.
+        self.actions_instances = {}
+        self.actions_indices   = None
+        self.spill_dir  = spill_dir
+        self.spill_fd   = None
+        self.spill_size = 0
+        self.spilled    = 0
+        self.lock       = threading.Lock()
+
+    def record(self, actions, steps):
+        plan = PlanRecord(actions, steps, self)
+        self.map_back(plan.actions)
+        return plan
+
+    def map_back(self, actions):
+        for action_index in actions:
+            if not action_index in self.actions_instances:
+                self.actions_instances[action_index] = self.encoder.map_back_action(self.encoder.get_actions_keys()[action_index-1])
+
+    def record_plan(self, plan):
+        """!
+        Returns the record of a UP plan, its actions are executed one per step.
+        """
+        if self.actions_indices is None:
+            self.actions_indices = {key: i+1 for i, key in enumerate(self.encoder.get_actions_keys())}
+        actions = array('i', [self.actions_indices[self.encoder._up_actionname_to_z3(a)] for a in plan.actions])
+        return self.record(actions, range(len(actions)))
+
+    def adopt(self, plan):
+        """!
+        Attaches a record received from another process, the records' actions indices have to
+        come from the same grounding.
+        """
+        plan.store = self
+        self.map_back(plan.actions)
+        return plan
+
+    def up_plan(self, plan):
+        actions = [self.actions_instances[a] for a in plan.actions]
+        return SequentialPlan([ActionInstance(a.action, a.actual_parameters) for a in actions if a is not None])
+
+    def z3_plan(self, plan):
+        assert self.encoder is not None, 'The blocking literals of a plan need the encoder.'
+        actions_keys = self.encoder.get_actions_keys()
+        return [self.encoder.up_actions_to_z3[actions_keys[a-1]][t] for a, t in zip(plan.actions, plan.steps)]
+
+    def spill(self, plan):
+        """!
+        Appends the plan's body to the spill file and drops it from memory.
+        """
+        if self.spill_dir is None or plan.body is None: return
+        if self.spill_fd is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_fd, spill_path = tempfile.mkstemp(dir=self.spill_dir, prefix='plans-', suffix='.bin')
+            # The file is only read by this store.
+            os.unlink(spill_path)
+            weakref.finalize(self, os.close, self.spill_fd)
+        data = plan.body.tobytes()
+        with self.lock:
+            os.pwrite(self.spill_fd, data, self.spill_size)
+            plan.spill_offset = self.spill_size
+            self.spill_size += len(data)
+        plan.body = None
+        self.spilled += 1
+
+    def load(self, plan):
+        assert plan.spill_offset is not None, 'The plan has neither a body nor a spilled body.'
+        body = array('i')
+        body.frombytes(os.pread(self.spill_fd, 2 * plan.length * body.itemsize, plan.spill_offset))
+        return body
+
+    def close(self):
+        """!
+        Drops the encoder, the records keep their UP plans.
+        """
+        self.encoder = None
+        self.actions_indices = None
+
+    def stats(self):
+        return {'spilled-plans': self.spilled, 'spilled-bytes': self.spill_size}
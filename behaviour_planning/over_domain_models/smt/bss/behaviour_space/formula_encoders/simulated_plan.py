@@ -0,0 +1,17 @@
+from unified_planning.plans import SequentialPlan
+
+class SimulatedPlan(SequentialPlan):
+    """!
+    A plan simulated on the grounded problem of an encoder. It keeps the visited states so the
+    dimensions can compute their values without calling the solver.
+    """
+    def __init__(self, plan, states, encoder):
+        super().__init__(plan.actions, plan.environment)
+        self.states  = states
+        self.encoder = encoder
+
+    def state(self, step):
+        """!
+        Returns the state after the given step, the last state is kept once the plan ends.
+        """
+        return self.states[min(step, len(self.states)-1)]
@@ -1,46 +1,198 @@
+import math
 
 from collections import defaultdict
 
 from z3 import *
 
 from unified_planning.plans import SequentialPlan
+from unified_planning.shortcuts import PlanValidator
 
 from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.linear_formula_encoder import EncoderSequential
-from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.smt_sequential_plan import SMTSequentialPlan
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.plan_record import PlanStore
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.simulated_plan import SimulatedPlan
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.encodings_cache import EncodingsCache
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.solver_profiles import SOLVER_PROFILES, TUNE_PROFILES, NO_TIMEOUT
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.solver_profiles import create_solver, domain_signature, load_tuned_profile, store_tuned_profile
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.plan_validation import PlanValidationPipeline, validate_plan
 
 from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.makespan_optimal_cost_bound import MakespanOptimalCostBound
+from behaviour_planning.over_domain_models.smt.bss.utilities import Profiler
 
 class BehaviourSpace:
-    def __init__(self, task, cfg=defaultdict(dict)) -> None:
-        self.task    = task
-        self.encoder = EncoderSequential(task)
+    def __init__(self, task, cfg=defaultdict(dict), profiler=None) -> None:
+        self.task     = task
+        self.profiler = Profiler() if profiler is None else profiler
+        with self.profiler.phase('grounding'):
+            self.encoder = EncoderSequential(task)
 
         self.upper_bound            = cfg.get('upper-bound', 100)
         self.run_plan_validation    = cfg.get('run-plan-validation', False)
+        # With validation workers the plans are validated in the background while solving.
+        self.validation_workers     = cfg.get('validation-workers', 0)
+        # Assert a blocking clause for every plan that fails validation.
+        self.block_invalid_plans    = cfg.get('block-invalid-plans', False)
+        self.plan_validator         = None
+        self.validation_pipeline    = None
+        self.blocked_invalid_plans  = 0
+        if self.run_plan_validation:
+            if self.validation_workers > 0: self.validation_pipeline = PlanValidationPipeline(task, self.validation_workers)
+            else: self.plan_validator = PlanValidator(name='sequential_plan_validator')
+        # Unroll the formula lazily, starting from a small horizon.
+        self.incremental_horizon    = cfg.get('incremental-horizon', False)
+        self.horizon_step           = cfg.get('horizon-step', 1)
+        # Every extension encodes the dimensions again over the whole horizon, growing the
+        # horizon geometrically keeps the number of extensions logarithmic in the upper bound.
+        self.horizon_growth         = cfg.get('horizon-growth', 2.0)
         
         self._behaviour_frequency = defaultdict(dict)
-        self._plans = []
+        # The plans are compact records, their bodies are spilled to this directory (if given)
+        # once their blocking clauses are asserted.
+        self.plans_store = PlanStore(task, self.encoder, cfg.get('spill-plans-dir', None))
+        self.plans_count = 0
+        # Behaviours are identified by integer ids interned from the dimensions' signatures.
+        self._behaviours_ids        = {}
+        self._behaviours_signatures = []
+        self._behaviours_expressions = {}
+        # The behaviours enumerated without plans and the plans extracted for them on demand.
+        self._enumerated_behaviours = []
+        self._behaviours_plans      = {}
+        self.enumeration_guard      = None
+        self.cubes_guards           = 0
+        # Whether the dimensions can compute their values from a simulated plan, it is known
+        # once the first plan is simulated.
+        self.simulate_behaviours    = None
 
-        self.encoder.encode(self.upper_bound)
+        self.dims_cfg  = cfg.get('dims', [])
+        if MakespanOptimalCostBound not in [d[0] for d in self.dims_cfg]:
+            self.dims_cfg += [(MakespanOptimalCostBound, {})]
+
+        # Logged messages.
+        self.log_msg = []
+
+        # The solver is created from a named profile, 'tune' races the profiles on this problem
+        # once per domain and keeps the winner.
+        self.solver_profiles = dict(SOLVER_PROFILES, **cfg.get('solver-profiles', {}))
+        self.solver_profile  = cfg.get('solver-profile', 'default')
+        tune_solver = self.solver_profile == 'tune'
+        if tune_solver:
+            self.tune_signature = domain_signature(task, self.dims_cfg)
+            self.tune_cache     = cfg.get('solver-tune-cache', None)
+            tuned_profile       = load_tuned_profile(self.tune_signature, self.tune_cache)
+            tune_solver         = tuned_profile is None
+            self.solver_profile = 'default' if tuned_profile is None else tuned_profile
+            if tuned_profile is not None: self.log_msg.append(f'Using the tuned solver profile {tuned_profile}.')
+        assert self.solver_profile in self.solver_profiles, f'Unknown solver profile {self.solver_profile}.'
+
+        if self.incremental_horizon:
+            self.horizon       = None
+            self.horizon_guard = None
+            self.solver = self.create_solver()
+            self.extend_horizon(min(cfg.get('initial-horizon', 1), self.upper_bound))
+        else:
+            self.horizon = self.upper_bound
+            # Reuse the encodings of an identical behaviour space if they were cached.
+            encodings_cache     = EncodingsCache(cfg['encodings-cache-dir']) if cfg.get('encodings-cache-dir', None) else None
+            encodings_cache_key = encodings_cache.key(task, self.upper_bound, self.dims_cfg) if encodings_cache else None
+            with self.profiler.phase('encodings-cache-load'):
+                is_cached = encodings_cache is not None and encodings_cache.load(self, encodings_cache_key)
+            if is_cached:
+                self.log_msg.append(f'The encodings have been loaded from the cache entry {encodings_cache_key}.')
+            else:
+                self.encode()
+                if encodings_cache:
+                    with self.profiler.phase('encodings-cache-store'):
+                        encodings_cache.store(self, encodings_cache_key)
+
+        # Restrict the space to a cube of the dimensions' values if requested.
+        self.restrict(cfg.get('cube', []))
+
+        if tune_solver: self.tune_solver(cfg.get('solver-tune-profiles', TUNE_PROFILES), cfg.get('solver-tune-timeout-ms', 60000))
+
+    def encode(self):
+        with self.profiler.phase('step-encoding'):
+            self.encoder.encode(self.upper_bound)
         
-        self.dims  = cfg.get('dims', [])
-        if MakespanOptimalCostBound not in [d[0] for d in self.dims]:
-            self.dims += [(MakespanOptimalCostBound, {})]
+        with self.profiler.phase('dims-encoding'):
+            self.dims = self.encode_dims()
+            # We need to know the index of the goal variable that is true.
+            for name, _dim in self.dims.items():
+                self.encoder.extend(_dim.encodings)
         
-        self.dims  = [d(self.encoder, additional_information) for d, additional_information in self.dims]
+        # Create the solver.
+        with self.profiler.phase('solver-add'):
+            self.solver = self.create_solver()
+            self.solver.add(self.encoder.assertions)
 
+    def encode_dims(self):
+        dims = [d(self.encoder, additional_information) for d, additional_information in self.dims_cfg]
         # convert the list to dict with keys as the names of the dimensions.
-        self.dims = {d.__class__.__name__: d for d in self.dims}
-        # We need to know the index of the goal variable that is true.
+        return {d.__class__.__name__: d for d in dims}
+
+    def restrict(self, cube):
+        """!
+        Restricts the behaviour space to a cube, a list of (dimension name, value) pairs
+        where the values are taken from the dimensions' partition.
+        """
+        cube_assertions = [self.dims[name].cube_expression(value) for name, value in cube]
+        if len(cube_assertions) == 0: return
+        self.encoder.extend(cube_assertions)
+        self.solver.add(cube_assertions)
+        self.log_msg.append(f'The behaviour space has been restricted to the cube {cube}.')
+
+    def cube_guard(self, cube):
+        """!
+        Returns a literal that restricts the behaviour space to a cube when it is assumed. The
+        cube is a list of (dimension name, values) pairs, a dimension takes any of its values.
+        """
+        self.cubes_guards += 1
+        guard = z3.Bool(f'bspace-cube-{self.cubes_guards}', ctx=self.encoder.ctx)
+        cube_expression = [z3.Or([self.dims[name].cube_expression(value) for value in values]) for name, values in cube]
+        self.solver.add(z3.Implies(guard, z3.And(cube_expression + [z3.BoolVal(True, ctx=self.encoder.ctx)])))
+        return guard
+
+    def extend_horizon(self, horizon):
+        """!
+        Extends the encoding up to the given horizon on the live solver.
+        The steps' formulas are asserted once. The formulas that only hold for this horizon
+        (the empty last step, the goal disjunction and the dimensions' encodings) are guarded
+        by a horizon literal which is_satisfiable assumes, the previous horizon's literal is
+        asserted false so the solver can drop its formulas. The dimensions are encoded over the
+        whole horizon on every extension (e.g., quadratic terms for the 'sum' makespan), see
+        next_horizon.
+        """
+        horizon = min(horizon, self.upper_bound)
+        if self.horizon is not None and horizon <= self.horizon: return False
+        start = 0 if self.horizon is None else self.horizon
+
+        with self.profiler.phase('step-encoding'):
+            step_assertions     = self.encoder.encode_steps(start, horizon)
+            # Like encode, every step but the last one executes at most one action. The previous
+            # last step is not the last step anymore.
+            execution_semantics = [self.encoder.encode_step_execution_semantics(t, False) for t in range(max(start-1, 0), horizon-1)]
+
+        # The dimensions have to be encoded again for the new horizon.
+        with self.profiler.phase('dims-encoding'):
+            dims = self.encode_dims()
+        for name, _dim in dims.items():
+            if name in getattr(self, 'dims', {}): _dim.var_domain |= self.dims[name].var_domain
+        self.dims = dims
+
+        horizon_assertions  = [self.encoder.encode_step_execution_semantics(horizon-1, True)]
+        horizon_assertions += [self.encoder.encode_goal_disjunction()]
         for name, _dim in self.dims.items():
-            self.encoder.extend(_dim.encodings)
-        
-        # Create the solver.
-        self.solver = Solver(ctx=self.encoder.ctx)
-        self.solver.add(self.encoder.assertions)
+            horizon_assertions.extend(_dim.encodings)
 
-        # Logged messages.
-        self.log_msg = []
+        # The horizon never shrinks, the previous horizon's formulas are dead.
+        if self.horizon_guard is not None: execution_semantics.append(z3.Not(self.horizon_guard))
+        self.horizon       = horizon
+        self.horizon_guard = z3.Bool(f'horizon-{horizon}', ctx=self.encoder.ctx)
+        guarded_assertion  = z3.Implies(self.horizon_guard, z3.And(horizon_assertions))
+        # encode_steps already stored the steps' formulas in the encoder's assertions.
+        self.encoder.extend(execution_semantics + [guarded_assertion])
+        with self.profiler.phase('solver-add'):
+            self.solver.add(step_assertions + execution_semantics + [guarded_assertion])
+        self.log_msg.append(f'The horizon has been extended to {horizon}.')
+        return True
 
     def __len__(self) -> list:
         return [(d.name, len(d)) for d in self.dims]
@@ -50,38 +202,159 @@ class BehaviourSpace:
         return self.encoder.ctx
         
     def reset(self):
-        self.solver = Solver(ctx=self.encoder.ctx)
+        self.solver = self.create_solver()
         self.solver.add(self.encoder.assertions)
         self.log_msg.append('The solver has been reset.')
 
+    def create_solver(self, profile=None):
+        return create_solver(self.encoder.ctx, self.solver_profiles[profile or self.solver_profile])
+
+    def tune_solver(self, profiles, timeout):
+        """!
+        Races the solver profiles on the first check of this behaviour space. The profiles run one
+        after the other and every profile is stopped once it is slower than the fastest so far.
+        The winner's solver replaces the current one and the winner is remembered for the domain.
+        """
+        times = {}
+        best_profile, best_solver = None, None
+        for profile in profiles:
+            with self.profiler.phase('solver-tuning'):
+                solver = self.create_solver(profile)
+                solver.add(self.encoder.assertions)
+                solver.set('timeout', timeout if best_profile is None else min(timeout, int(times[best_profile] * 1000) + 1))
+                try:
+                    result = self.profiler.check(solver, self.horizon_assumptions(), profile)
+                except Z3Exception as e:
+                    self.log_msg.append(f'The solver profile {profile} failed: {e}')
+                    continue
+            if result == unknown: continue
+            times[profile] = self.profiler.checks[-1]['wall-s']
+            if best_profile is None or times[profile] < times[best_profile]:
+                best_profile, best_solver = profile, solver
+
+        if best_profile is None:
+            self.log_msg.append('No solver profile finished within the tuning timeout, keeping the default profile.')
+            return None
+        best_solver.set('timeout', NO_TIMEOUT)
+        self.solver, self.solver_profile = best_solver, best_profile
+        store_tuned_profile(self.tune_signature, self.tune_cache, best_profile, times)
+        self.log_msg.append(f'The solver profile {best_profile} won the tuning race: {times}')
+        return best_profile
+
+    def close(self):
+        """!
+        Frees the solver, the dimensions and the encoder (with its z3 context). The behaviour
+        space cannot be used after it is closed, but its logs and frequencies are kept.
+        """
+        if self.encoder is None: return
+        if self.validation_pipeline is not None:
+            # The plans keep their validation results.
+            self.validation_pipeline.close()
+            self.log_msg.extend(f'Plan {plan.id} is invalid. Reason: {plan.validation_fail_reason}' for plan in self.validation_pipeline.pop_invalid_plans())
+        self.solver = None
+        self.dims   = {}
+        self.plans_store.close()
+        self._behaviours_expressions = {}
+        self._behaviours_plans = {}
+        self.horizon_guard = None
+        self.enumeration_guard = None
+        self.encoder.close()
+        self.encoder = None
+        self.log_msg.append('The behaviour space has been closed.')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
     def extract_plan(self):
         """!
         This function should update the plan with its behaviour and any extra information 
         extracted from the model.
         """
-        model = self.solver.model()
-        makespan_optimal_cost_bound = self.dims[MakespanOptimalCostBound.__name__]
-        extracted_plan_length = makespan_optimal_cost_bound.discretize(makespan_optimal_cost_bound.value(model))
-        plan = self.encoder.extract_plan(model, extracted_plan_length)
-        # We need to extract the behaviour from the model.
-        behaviour = self.infer_behaviour(model)
-        # Update the plan with its behaviour.
-        setattr(plan, "behaviour", behaviour)
-        # Update its id.
-        setattr(plan, "id", len(self._plans)+1)
-        # Run validation if enabled.
-        if self.run_plan_validation: is_plan_valid = plan.validate()
-        else: setattr(plan, "isvalid", True), setattr(plan, "reason", 'Validation skipped')
-        
-        behaviour_str = str(behaviour)
-        if not behaviour_str in self._behaviour_frequency: 
-            self._behaviour_frequency[behaviour_str] = 0
-        self._behaviour_frequency[behaviour_str] += 1
-        self._plans.append(plan)
+        with self.profiler.phase('extract-plan'):
+            model = self.solver.model()
+            makespan_optimal_cost_bound = self.dims[MakespanOptimalCostBound.__name__]
+            extracted_plan_length = makespan_optimal_cost_bound.discretize(makespan_optimal_cost_bound.value(model))
+            plan = self.plans_store.record(*self.encoder.extract_plan_actions(model, extracted_plan_length))
+            # We need to extract the behaviour from the model.
+            behaviour = self.infer_behaviour(model)
+        # Update the plan with its behaviour and id.
+        self.record_plan(plan, behaviour)
+        return plan if self.validate(plan) else None
 
-        if not is_plan_valid:
+    def validate(self, plan):
+        """!
+        Validates the plan if enabled, the pipeline attaches the result to the plan once it is done.
+        @return: False if the plan is invalid, it has been blocked and has to be dropped.
+        """
+        if not self.run_plan_validation:
+            setattr(plan, "isvalid", True), setattr(plan, "reason", 'Validation skipped')
+        elif self.validation_pipeline is not None:
+            self.validation_pipeline.submit(plan)
+        else:
+            with self.profiler.phase('plan-validation'):
+                is_plan_valid = validate_plan(self.plan_validator, self.task, plan)
+            if not is_plan_valid:
+                self.log_msg.append(f'Plan {plan.id} is invalid. Reason: {plan.validation_fail_reason}')
+                # The plan is dropped, without a blocking clause the solver would find it again.
+                self.block_plans([plan])
+                return False
+        return True
+
+    def block_plans(self, plans):
+        """!
+        Asserts the blocking clauses of (invalid) plans, whatever the forbid mode is.
+        """
+        for plan in plans:
+            self.solver.add(z3.Not(z3.And(plan._z3_plan), ctx=self.encoder.ctx))
+            self.spill_plan(plan)
+        self.blocked_invalid_plans += len(plans)
+
+    def spill_plan(self, plan):
+        """!
+        Drops the plan's body from memory if spilling is enabled, its blocking clause must be
+        asserted already.
+        """
+        self.plans_store.spill(plan)
+
+    def collect_invalid_plans(self):
+        """!
+        Logs the plans the validation pipeline found invalid since the last call and blocks them
+        if requested. z3 is not thread safe, so this runs on the solver's thread before every check.
+        """
+        if self.validation_pipeline is None: return
+        invalid_plans = self.validation_pipeline.pop_invalid_plans()
+        for plan in invalid_plans:
             self.log_msg.append(f'Plan {plan.id} is invalid. Reason: {plan.validation_fail_reason}')
-            return None
+        if self.block_invalid_plans: self.block_plans(invalid_plans)
+
+    def wait_validation(self):
+        """!
+        Waits for the background validation of the extracted plans to finish.
+        """
+        if self.validation_pipeline is None or self.encoder is None: return
+        with self.profiler.phase('plan-validation'):
+            self.validation_pipeline.wait()
+        self.collect_invalid_plans()
+
+    def validation_stats(self):
+        stats = {'blocked-invalid-plans': self.blocked_invalid_plans}
+        if self.validation_pipeline is not None: stats.update(self.validation_pipeline.stats())
+        return stats
+
+    def record_plan(self, plan, behaviour):
+        """!
+        Sets the plan's behaviour and id and counts its behaviour.
+        """
+        setattr(plan, "behaviour", behaviour)
+        self.plans_count += 1
+        setattr(plan, "id", self.plans_count)
+        if not behaviour in self._behaviour_frequency: 
+            self._behaviour_frequency[behaviour] = 0
+        self._behaviour_frequency[behaviour] += 1
         return plan
 
     def is_satisfiable(self, assumption=[], timeout=None, memorylimit=None) -> bool:
@@ -93,7 +366,7 @@ class BehaviourSpace:
             
         is_formula_satisfiable = None
         try:
-            is_formula_satisfiable = self.solver.check(assumption) == sat
+            is_formula_satisfiable = self.check(assumption) == sat
         except Exception as e:
             is_formula_satisfiable = False
             self.log_msg.append(f'An error occured while checking the satisfiability of the formula: {e}')
@@ -101,11 +374,94 @@ class BehaviourSpace:
             assert is_formula_satisfiable is not None, 'The satisfiability of the formula is not determined.'
             return is_formula_satisfiable
     
+    def check(self, assumption=[]):
+        """!
+        Checks the formula under the current horizon. With an incremental horizon, the horizon
+        is extended as long as the formula is unsatisfiable and the upper bound is not reached.
+        """
+        self.collect_invalid_plans()
+        result = self.profiler.check(self.solver, list(assumption) + self.horizon_assumptions(), self.solver_profile)
+        while self.incremental_horizon and result == unsat and self.extend_horizon(self.next_horizon()):
+            result = self.profiler.check(self.solver, list(assumption) + self.horizon_assumptions(), self.solver_profile)
+        return result
+
+    def next_horizon(self):
+        return max(self.horizon + self.horizon_step, int(math.ceil(self.horizon * self.horizon_growth)))
+
+    def horizon_assumptions(self):
+        return [self.horizon_guard] if self.incremental_horizon else []
+
     def infer_behaviour(self, model):
-        behaviour_vars = []
-        for dimname, dim in self.dims.items():
-            behaviour_vars.append(dim.behaviour_expression(model))
-        return z3.And(behaviour_vars)
+        """!
+        Returns the id of the behaviour of a model (or a simulated plan).
+        """
+        return self.intern_behaviour(tuple(dim.signature(model) for dim in self.dims.values()))
+
+    def intern_behaviour(self, signature):
+        """!
+        Returns the id of a behaviour's signature (e.g., sent by another process).
+        """
+        if not signature in self._behaviours_ids:
+            self._behaviours_ids[signature] = len(self._behaviours_signatures)
+            self._behaviours_signatures.append(signature)
+        return self._behaviours_ids[signature]
+
+    def behaviour_signature(self, behaviour):
+        return self._behaviours_signatures[behaviour]
+
+    def behaviour_expression(self, behaviour):
+        """!
+        Returns the z3 expression of a behaviour id, it is only built when it is needed
+        (e.g., to forbid the behaviour).
+        """
+        if not behaviour in self._behaviours_expressions:
+            signature = self._behaviours_signatures[behaviour]
+            self._behaviours_expressions[behaviour] = z3.And([dim.signature_expression(value) for dim, value in zip(self.dims.values(), signature)])
+        return self._behaviours_expressions[behaviour]
+
+    def enumerate_behaviours(self, limit=None, timeout=None, memorylimit=None):
+        """!
+        Enumerates the behaviours of the space without extracting their plans: a model is only
+        evaluated on the dimensions' variables and its behaviour is blocked under a guard literal,
+        so the plans' actions are never read. Calling it again continues after the behaviours
+        already enumerated. The plan of a behaviour is extracted on demand by behaviour_plan.
+        """
+        if self.enumeration_guard is None:
+            self.enumeration_guard = z3.Bool('bspace-enumerate-behaviours', ctx=self.encoder.ctx)
+        if timeout is not None:     self.solver.set('timeout', timeout)
+        if memorylimit is not None: self.solver.set('max_memory', memorylimit)
+
+        enumerated = 0
+        while limit is None or enumerated < limit:
+            if self.check([self.enumeration_guard]) != sat: break
+            with self.profiler.phase('enumerate-behaviours'):
+                behaviour = self.infer_behaviour(self.solver.model())
+                self.solver.add(z3.Implies(self.enumeration_guard, z3.Not(self.behaviour_expression(behaviour))))
+            self._enumerated_behaviours.append(behaviour)
+            enumerated += 1
+            yield behaviour
+
+    def count_behaviours(self, timeout=None, memorylimit=None):
+        """!
+        Returns the number of behaviours in the space, see enumerate_behaviours.
+        """
+        for _ in self.enumerate_behaviours(timeout=timeout, memorylimit=memorylimit): pass
+        self.log_msg.append(f'{len(self._enumerated_behaviours)} behaviours have been enumerated.')
+        return len(self._enumerated_behaviours)
+
+    def behaviour_plan(self, behaviour):
+        """!
+        Returns a plan of the given behaviour id, or None if the behaviour has no plan.
+        """
+        if not behaviour in self._behaviours_plans:
+            if self.check([self.behaviour_expression(behaviour)]) != sat:
+                self.log_msg.append(f'The behaviour {behaviour} has no plan.')
+                return None
+            plan = self.extract_plan()
+            # An invalid plan is not kept, another plan may be found for the behaviour.
+            if plan is None: return None
+            self._behaviours_plans[behaviour] = plan
+        return self._behaviours_plans[behaviour]
 
     def plan_behaviour(self, plan:SequentialPlan, i=0):
         """!
@@ -113,18 +469,52 @@ class BehaviourSpace:
         its behaviour.
         """
         assert isinstance(plan, SequentialPlan), 'The plan is not of type SequentialPlan.'
+        # Make sure the plan fits in the encoded horizon, the last step is empty.
+        if self.incremental_horizon: self.extend_horizon(len(plan.actions)+1)
         # Get the plan's behaviour before returning its number.
         _actions = self.encoder.convert(plan)
         _tmp_assertions = []
         _tmp_assertions.extend([a == z3.BoolVal(True, ctx=self.encoder.ctx) for a in _actions])
         for _t in range(len(plan.actions), len(self.encoder)):
             _tmp_assertions.extend([a == z3.BoolVal(False, ctx=self.encoder.ctx) for a in self.encoder.get_actions_vars(_t)])
-        satres = self.solver.check(_tmp_assertions) == sat
+        satres = self.profiler.check(self.solver, _tmp_assertions + self.horizon_assumptions(), self.solver_profile) == sat
         if not satres:
             self.log_msg.append(f'The behaviour space is not satisfiable after appending plan {i}')
             return None
         self.log_msg.append(f'Plan {i} has been added to the behaviour space.')
         return self.extract_plan()
+
+    def simulate_plan_behaviour(self, plan:SequentialPlan, i=0):
+        """!
+        Same as plan_behaviour but the behaviour is computed by simulating the plan and asking the 
+        dimensions for their values, so no solver call is made. Falls back to plan_behaviour if 
+        one of the dimensions cannot compute its value from a plan, for this plan and the next ones.
+        """
+        assert isinstance(plan, SequentialPlan), 'The plan is not of type SequentialPlan.'
+        if self.simulate_behaviours is False: return self.plan_behaviour(plan, i)
+        # The last step of the formula is empty.
+        if len(plan.actions) >= self.upper_bound:
+            self.log_msg.append(f'Plan {i} does not fit in the upper bound {self.upper_bound}.')
+            return None
+        # The dimensions' values depend on the encoded horizon (e.g., the goal states).
+        if self.incremental_horizon: self.extend_horizon(len(plan.actions)+1)
+        with self.profiler.phase('simulation'):
+            states = self.encoder.simulate(plan)
+        if states is None:
+            self.log_msg.append(f'Plan {i} is not valid for the behaviour space.')
+            return None
+        try:
+            with self.profiler.phase('simulated-behaviour'):
+                behaviour = self.infer_behaviour(SimulatedPlan(plan, states, self.encoder))
+        except NotImplementedError as e:
+            self.simulate_behaviours = False
+            self.log_msg.append(f'The plans cannot be simulated ({e}), the solver computes their behaviours.')
+            return self.plan_behaviour(plan, i)
+        self.simulate_behaviours = True
+        plan_record = self.plans_store.record_plan(plan)
+        setattr(plan_record, "isvalid", True), setattr(plan_record, "reason", 'Validated by simulation')
+        self.log_msg.append(f'Plan {i} has been added to the behaviour space.')
+        return self.record_plan(plan_record, behaviour)
     
     def compute_behaviour_count(self):
         return len(self._behaviour_frequency.keys())
@@ -0,0 +1,102 @@
+import os
+import gzip
+import json
+import shutil
+import hashlib
+import tempfile
+
+import z3
+
+# Bump when the encodings change so old entries are not reused.
+ENCODINGS_CACHE_VERSION = 5
+
+class EncodingsCache:
+    """!
+    A content-addressed on-disk cache of encoded behaviour spaces. Every entry holds the solver's
+    assertions in SMT-LIB2 (gzipped) and the variable tables needed by extract_plan and the dimensions.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def key(self, task, upper_bound, dims_cfg):
+        """!
+        Hashes the planning task, the upper bound and the dimensions' configuration.
+        """
+        h = hashlib.sha256()
+        h.update(f'version:{ENCODINGS_CACHE_VERSION}\n'.encode())
+        h.update(str(task).encode())
+        h.update(f'upper-bound:{upper_bound}\n'.encode())
+        for dim, additional_information in dims_cfg:
+            h.update(f'dim:{dim.__module__}.{dim.__qualname__}:{repr(additional_information)}\n'.encode())
+            # The resources dimensions are configured by a file.
+            if isinstance(additional_information, str) and os.path.isfile(additional_information):
+                with open(additional_information, 'rb') as f:
+                    h.update(f.read())
+        return h.hexdigest()
+
+    def load(self, bspace, key):
+        """!
+        Restores the encoder's variable tables, the dimensions and the solver of the behaviour space.
+        @return: True on a cache hit.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(entry_dir): return False
+
+        with open(os.path.join(entry_dir, 'tables.json'), 'r') as f:
+            tables = json.load(f)
+        with gzip.open(os.path.join(entry_dir, 'encodings.smt2.gz'), 'rt') as f:
+            encodings = f.read()
+
+        encoder = bspace.encoder
+        # Recreate the variables of every step, the assertions refer to them by name. Encoding step
+        # t creates the variables of step t+1, so the last layer is formula-length.
+        for t in range(0, tables['formula-length']+1):
+            encoder.create_variables(t)
+        encoder.formula_length = tables['formula-length']
+        encoder.action_name_to_number.update(tables['action-name-to-number'])
+
+        solver = bspace.create_solver()
+        solver.from_string(encodings)
+        encoder.extend(list(solver.assertions()))
+        encoder.goal_states = self.load_goal_states(encoder, tables['goal-states'])
+
+        bspace.dims = {d.__name__: d.restore(encoder, additional_information, tables['dims'][d.__name__]) \
+                       for d, additional_information in bspace.dims_cfg}
+        bspace.solver = solver
+        return True
+
+    def load_goal_states(self, encoder, goal_states):
+        """!
+        Parses the goal states' conjuncts over the encoder's fluents in one go.
+        """
+        if len(goal_states) == 0: return []
+        decls = {var.decl().name(): var for fluent_vars in encoder.up_fluent_to_z3.values() for var in fluent_vars.values()}
+        conjuncts = z3.parse_smt2_string(''.join(f'(assert {c})' for goal in goal_states for c in goal), decls=decls, ctx=encoder.ctx)
+        restored, i = [], 0
+        for goal in goal_states:
+            # And of a single conjunct keeps the goal's structure (e.g., the goal ordering reads its first child).
+            restored.append(z3.And([conjuncts[j] for j in range(i, i+len(goal))]))
+            i += len(goal)
+        return restored
+
+    def store(self, bspace, key):
+        tables = {
+            'formula-length': len(bspace.encoder),
+            'action-name-to-number': dict(bspace.encoder.action_name_to_number),
+            # The goal states are kept as the SMT-LIB2 of their conjuncts, the dimensions and the
+            # goal disjunction read them.
+            'goal-states': [[c.sexpr() for c in goal.children()] for goal in bspace.encoder.goal_states],
+            'dims': {name: dim.dump_state() for name, dim in bspace.dims.items()}
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary directory first, so readers never see a partial entry.
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir)
+        with open(os.path.join(tmp_dir, 'tables.json'), 'w') as f:
+            json.dump(tables, f)
+        with gzip.open(os.path.join(tmp_dir, 'encodings.smt2.gz'), 'wt') as f:
+            f.write(bspace.solver.sexpr())
+        try:
+            os.rename(tmp_dir, os.path.join(self.cache_dir, key))
+        except OSError:
+            # Another process stored the same entry.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
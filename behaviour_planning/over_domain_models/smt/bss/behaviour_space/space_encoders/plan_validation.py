@@ -0,0 +1,92 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from unified_planning.shortcuts import PlanValidator
+from unified_planning.engines.results import ValidationResultStatus
+
+def validate_plan(validator, task, plan):
+    """!
+    Validates the plan on the task with UP's validator and sets its isvalid and
+    validation_fail_reason attributes.
+    @return: True if the plan is valid.
+    """
+    result = validator.validate(task, plan.plan)
+    setattr(plan, 'isvalid', result.status == ValidationResultStatus.VALID)
+    if not plan.isvalid:
+        reason = result.reason.name if result.reason is not None else str(result.status)
+        if result.inapplicable_action is not None: reason += f' ({result.inapplicable_action})'
+        setattr(plan, 'validation_fail_reason', reason)
+    return plan.isvalid
+
+class PlanValidationPipeline:
+    """!
+    Validates the plans in the background while the solver looks for the next ones. The plans'
+    validation attributes are set as the validations complete, and the invalid plans are queued
+    so the behaviour space can block them from its own thread.
+
+    The workers are threads: z3 releases the GIL while it checks, so the validations overlap with
+    the solver, and the plans do not have to be pickled.
+    """
+    def __init__(self, task, workers=1):
+        self.task     = task
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='plan-validation')
+        # Every worker thread has its own validator.
+        self.local    = threading.local()
+        self.lock     = threading.Lock()
+        # Only the running validations are kept, so long runs do not pile up futures.
+        self.pending  = set()
+        self.errors   = []
+        # deque's append and popleft are thread safe.
+        self.invalid_plans = deque()
+        self.validated = 0
+        self.invalid   = 0
+
+    def submit(self, plan):
+        setattr(plan, 'isvalid', None)
+        future = self.executor.submit(self.validate, plan)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.done)
+
+    def validate(self, plan):
+        if getattr(self.local, 'validator', None) is None:
+            self.local.validator = PlanValidator(name='sequential_plan_validator')
+        is_valid = validate_plan(self.local.validator, self.task, plan)
+        with self.lock:
+            self.validated += 1
+            if not is_valid: self.invalid += 1
+        if not is_valid: self.invalid_plans.append(plan)
+        return is_valid
+
+    def done(self, future):
+        with self.lock:
+            self.pending.discard(future)
+            if future.exception() is not None: self.errors.append(future.exception())
+
+    def pop_invalid_plans(self):
+        """!
+        Returns the invalid plans found since the last call.
+        """
+        plans = []
+        while len(self.invalid_plans) > 0:
+            plans.append(self.invalid_plans.popleft())
+        return plans
+
+    def wait(self):
+        """!
+        Blocks until all the submitted plans are validated.
+        """
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+        # A failed validation must not go unnoticed.
+        with self.lock:
+            errors, self.errors = self.errors, []
+        if len(errors) > 0: raise errors[0]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def stats(self):
+        return {'validated': self.validated, 'invalid': self.invalid, 'pending': len(self.pending)}
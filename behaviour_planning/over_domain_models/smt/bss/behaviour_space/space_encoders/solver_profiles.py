@@ -0,0 +1,68 @@
+import os
+import json
+import hashlib
+
+import z3
+
+# z3's default (and maximum) timeout, setting it removes a previous timeout.
+NO_TIMEOUT = 4294967295
+
+# A solver profile is the logic the solver is created for (None for z3's default SMT solver)
+# and the parameters set on it. bspace_cfg['solver-profiles'] adds or overrides profiles.
+SOLVER_PROFILES = {
+    'default':          {'logic': None,    'params': {}},
+    # z3's finite domain solver bit-blasts the bounded integers and hands the PB constraints
+    # to its SAT solver, the formula must not have unbounded integers or uninterpreted functions.
+    'sat':              {'logic': 'QF_FD', 'params': {}},
+    # Same as sat, but the PB and cardinality constraints are compiled to clauses.
+    'sat-totalizer':    {'logic': 'QF_FD', 'params': {'sat.pb.solver': 'totalizer', 'sat.cardinality.encoding': 'totalizer'}},
+    'smt-no-relevancy': {'logic': None,    'params': {'smt.relevancy': 0}},
+    'smt-simplex':      {'logic': None,    'params': {'smt.arith.solver': 2}},
+}
+
+# The profiles raced by the tuning mode unless bspace_cfg['solver-tune-profiles'] is set.
+TUNE_PROFILES = ['default', 'sat', 'sat-totalizer', 'smt-no-relevancy']
+
+# The winners of the tuning mode in this process, keyed by domain signature.
+_tuned_profiles = {}
+
+def create_solver(ctx, profile):
+    solver = z3.SolverFor(profile['logic'], ctx=ctx) if profile.get('logic', None) else z3.Solver(ctx=ctx)
+    for key, value in profile.get('params', {}).items():
+        solver.set(key, value)
+    return solver
+
+def domain_signature(task, dims_cfg):
+    """!
+    Hashes what shapes the behaviour space's formula for every problem of a domain: the types,
+    fluents and (lifted) actions of the task and the dimensions.
+    """
+    h = hashlib.sha256()
+    for t in task.user_types: h.update(f'type:{t}\n'.encode())
+    for f in task.fluents:    h.update(f'fluent:{f}\n'.encode())
+    for a in task.actions:    h.update(f'action:{a}\n'.encode())
+    for dim, additional_information in dims_cfg:
+        h.update(f'dim:{dim.__module__}.{dim.__qualname__}\n'.encode())
+    return h.hexdigest()
+
+def load_tuned_profile(signature, tune_cache):
+    if signature in _tuned_profiles: return _tuned_profiles[signature]
+    if tune_cache and os.path.exists(tune_cache):
+        with open(tune_cache, 'r') as f:
+            return json.load(f).get(signature, {}).get('profile', None)
+    return None
+
+def store_tuned_profile(signature, tune_cache, profile, times):
+    _tuned_profiles[signature] = profile
+    if not tune_cache: return
+    os.makedirs(os.path.dirname(os.path.abspath(tune_cache)), exist_ok=True)
+    entries = {}
+    if os.path.exists(tune_cache):
+        with open(tune_cache, 'r') as f:
+            entries = json.load(f)
+    entries[signature] = {'profile': profile, 'times': times}
+    # Write to a temporary file first so concurrent runs never read a partial file.
+    tmp_file = f'{tune_cache}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp_file, tune_cache)
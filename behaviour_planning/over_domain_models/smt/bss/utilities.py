@@ -1,7 +1,11 @@
 import os
+import json
+import threading
 from collections import defaultdict
+from contextlib import contextmanager
 
 import time
+import resource
 
 from .config import config
 
@@ -18,18 +22,89 @@ def log(message, level):
     elif level >= 4:
         logger.debug(message)
 
-def timethis(level):
-    """ Decorator to allow to cleanly time functions """
-    def inner_decorator(f):
-        def wrapped(*args, **kwargs):
-            start_time = time.time()  # Record the start time
-            res = f(*args, **kwargs)
-            end_time = time.time()  # Record the end time
-            time_elapsed = end_time - start_time  # Calculate time elapsed for this iteration
-            log(f"{f.__module__}:{f.__name__}: {round(time_elapsed,2)}s", level)
-            return res
-        return wrapped
-    return inner_decorator
+class Profiler:
+    """!
+    Records the wall time, CPU time and RSS growth of the planning phases (parsing, seed planning,
+    grounding, encoding, checks, ...) and the z3 statistics of every check. The records are 
+    returned by logs() and can be written as a trace file (Chrome trace event format).
+    The RSS growth of a phase is the change of the current RSS over its calls, the process'
+    peak RSS would charge a phase with the memory of the phases before it.
+    """
+    def __init__(self):
+        self.phases = {}
+        self.checks = []
+        self.events = []
+        self.start_time = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start_wall, start_cpu, start_rss = time.perf_counter(), time.process_time(), current_rss_mb()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+            stats = self.phases.setdefault(name, {'calls': 0, 'wall-s': 0.0, 'cpu-s': 0.0, 'rss-delta-mb': 0.0})
+            stats['calls']  += 1
+            stats['wall-s'] += wall
+            stats['cpu-s']  += cpu
+            stats['rss-delta-mb'] += current_rss_mb() - start_rss
+            self.events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                                'ts': (start_wall - self.start_time) * 1e6, 'dur': wall * 1e6})
+
+    def check(self, solver, assumptions, profile='default'):
+        """!
+        Runs solver.check under the 'check' phase and records the solver's statistics along with
+        the name of the solver's profile.
+        """
+        start_wall = time.perf_counter()
+        with self.phase('check'):
+            result = solver.check(assumptions)
+        statistics = solver.statistics()
+        record = {'result': str(result), 'wall-s': time.perf_counter() - start_wall, 'assumptions': len(assumptions), 'profile': profile}
+        record.update({key: statistics.get_key_value(key) for key in statistics.keys()})
+        self.checks.append(record)
+        return result
+
+    def merge(self, logs):
+        """!
+        Adds the records of another profiler's logs (e.g., a worker process).
+        """
+        for name, other in logs['phases'].items():
+            stats = self.phases.setdefault(name, {'calls': 0, 'wall-s': 0.0, 'cpu-s': 0.0, 'rss-delta-mb': 0.0})
+            for key in ['calls', 'wall-s', 'cpu-s', 'rss-delta-mb']: stats[key] += other[key]
+        self.checks.extend(logs['checks'])
+        self.events.extend(logs.get('events', []))
+
+    def profiles(self):
+        """!
+        Sums the checks' statistics per solver profile (the memory statistics are maxed).
+        """
+        summary = {}
+        for record in self.checks:
+            stats = summary.setdefault(record.get('profile', 'default'), {'checks': 0})
+            stats['checks'] += 1
+            for key, value in record.items():
+                if key == 'assumptions' or isinstance(value, bool) or not isinstance(value, (int, float)): continue
+                stats[key] = max(stats.get(key, 0), value) if 'memory' in key else stats.get(key, 0) + value
+        return summary
+
+    def logs(self, events=False):
+        ret_logs = {'phases': self.phases, 'checks': self.checks, 'profiles': self.profiles()}
+        if events: ret_logs['events'] = self.events
+        return ret_logs
+
+    def dump_trace(self, trace_file):
+        with open(trace_file, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        # Without procfs (e.g., macOS) only the peak RSS is known.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
 def compute_behaviour_space_statistics(_diverseplans, _bspace):
     retstats = defaultdict(dict)
@@ -44,5 +119,11 @@ def compute_behaviour_space_statistics(_diverseplans, _bspace):
 
     #retstats['plans-details'] = plansdetails
     retstats['bspace-stats']  = _bspace._behaviour_frequency
+    # The behaviours' ids with their dimensions' values.
+    retstats['behaviours-dims'] = list(_bspace.dims.keys())
+    retstats['behaviours']    = {b: _bspace.behaviour_signature(b) for b in set(_bspace._behaviour_frequency.keys()) | set(_bspace._enumerated_behaviours)}
+    retstats['enumerated-behaviours'] = len(_bspace._enumerated_behaviours)
+    retstats['plans-validation'] = _bspace.validation_stats()
+    retstats['plans-store'] = _bspace.plans_store.stats()
 
     return retstats
\ No newline at end of file
@@ -28,13 +28,27 @@ def create_parser():
     parser.add_argument('-q', type=float, help='Quality bound factor')
     
     parser.add_argument('--add-goal-ordering', action='store_true', help='Add goal ordering to the plan')
+    parser.add_argument('--goal-ordering-encoding', choices=['uf', 'precedence'], default='uf', help='Encoding of the goal ordering dimension')
     
     parser.add_argument('--add-resource-count', action='store_true', help='Add resource count to the plan')
     parser.add_argument('--resource-file', help='Resource file to use')
 
     parser.add_argument('--add-makespan', action='store_true', help='Add makespan to the plan')
     parser.add_argument('--disable-action-check', action='store_true', help='Disable action check')
+    parser.add_argument('--add-action-cost', action='store_true', help='Add the action cost (MinimizeActionCosts metric) to the plan')
+    parser.add_argument('--cost-buckets', type=int, nargs='+', help='Lower bounds of the action cost buckets')
+
+    parser.add_argument('--makespan-encoding', choices=['sum', 'chain'], default='sum', help='Encoding of the makespan dimension')
+
+    parser.add_argument('--count-behaviours', action='store_true', help='Only count the behaviours of the space, no plans are generated')
+
+    parser.add_argument('--workers', type=int, help='Number of worker processes enumerating disjoint parts of the behaviour space')
+
+    parser.add_argument('--validation-workers', type=int, help='Validate the plans on this many background threads while solving')
+    parser.add_argument('--block-invalid-plans', action='store_true', help='Block the plans that fail validation')
+    parser.add_argument('--spill-plans-dir', help='Directory to spill the plans to once they are blocked, to bound the memory')
 
     parser.add_argument('--dump-dir', help='Directory to dump plans to')
+    parser.add_argument('--trace-file', help='File to write the trace of the planning phases to (Chrome trace event format)')
 
     return parser
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import resource
+import argparse
+import multiprocessing
+
+from .utilities import read_planner_config
+
+def create_batch_parser():
+
+    parser = argparse.ArgumentParser(prog='pybehaviourplanning_domain_models batch',
+                                     description = "Runs a manifest of Behaviour Planning jobs on a pool of worker processes",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('manifest', help='Path to a JSON file with the list of jobs')
+    parser.add_argument('--dump-dir', required=True, help='Directory to dump the jobs results to, every job gets its own sub-directory')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Number of jobs to run in parallel')
+    parser.add_argument('--time-limit', type=float, default=1800, help='Wall-clock time limit of a job in seconds')
+    parser.add_argument('--memory-limit', type=int, default=16000, help='Memory limit of a job in MB')
+
+    return parser
+
+def job_args(job, job_dump_dir):
+    """!
+    Converts a manifest job to the arguments of a single pybehaviourplanning_domain_models run.
+    A job is a dict with the keys: config, domain, problem and optionally name, k, q and args, where
+    args is a list of extra CLI arguments (e.g., ["--add-goal-ordering"]).
+    """
+    args = [job['config'], job['domain'], job['problem']]
+    if 'k' in job: args += ['-k', str(job['k'])]
+    if 'q' in job: args += ['-q', str(job['q'])]
+    args += job.get('args', [])
+    args += ['--dump-dir', job_dump_dir]
+    return args
+
+def run_job(args, job_dump_dir, memory_limit):
+    """!
+    Runs one job in a forked worker process. The planner's modules are already imported by the
+    parent process, so the job does not pay the imports again.
+    """
+    from .bplanningcli import main
+    # The job and the planners it launches (e.g., symk) get their own process group, so a
+    # timeout stops all of them.
+    os.setpgrp()
+    os.makedirs(job_dump_dir, exist_ok=True)
+    # The plans and stats of a previous run of the job must not be counted.
+    plans_dir = os.path.join(job_dump_dir, 'plans')
+    shutil.rmtree(plans_dir, ignore_errors=True)
+    if os.path.exists(os.path.join(job_dump_dir, 'job.json')): os.remove(os.path.join(job_dump_dir, 'job.json'))
+    memory_limit_bytes = memory_limit * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    try:
+        with open(os.path.join(job_dump_dir, 'run.log'), 'w') as log_file:
+            os.dup2(log_file.fileno(), sys.stdout.fileno())
+            os.dup2(log_file.fileno(), sys.stderr.fileno())
+            main(args)
+    finally:
+        # The job's stats are written even if the planner raised.
+        sys.stdout.flush()
+        with open(os.path.join(job_dump_dir, 'job.json'), 'w') as f:
+            json.dump({'max-rss-mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                       'plans': len(os.listdir(plans_dir)) if os.path.isdir(plans_dir) else 0}, f)
+
+def stop_job(process):
+    """!
+    Stops a job along with the processes it launched (its process group).
+    """
+    kill_group(process.pid, signal.SIGTERM)
+    process.join(5)
+    # The planners the job launched may outlive it.
+    kill_group(process.pid, signal.SIGKILL)
+    process.join()
+
+def kill_group(pgid, sig):
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        pass
+
+def batch_main(args):
+    parser = create_batch_parser()
+    args = parser.parse_args(args)
+
+    with open(args.manifest, 'r') as f:
+        jobs = json.load(f)
+
+    # Every job dumps to the directory named after it.
+    names = [job.get('name', f'job_{idx}') for idx, job in enumerate(jobs)]
+    duplicates = sorted(set(name for name in names if names.count(name) > 1))
+    assert len(duplicates) == 0, f'The job names must be unique, found duplicates: {duplicates}.'
+
+    # Read every configuration once, the workers inherit them.
+    for job in jobs: read_planner_config(job['config'])
+
+    mp_context = multiprocessing.get_context('fork')
+    pending = list(enumerate(jobs))
+    running = {}
+    summary = []
+    while len(pending) > 0 or len(running) > 0:
+        # Start as many jobs as we have free workers.
+        while len(pending) > 0 and len(running) < args.jobs:
+            idx, job = pending.pop(0)
+            name = job.get('name', f'job_{idx}')
+            job_dump_dir = os.path.join(args.dump_dir, name)
+            process = mp_context.Process(target=run_job, args=(job_args(job, job_dump_dir), job_dump_dir, job.get('memory-limit', args.memory_limit)))
+            process.start()
+            running[name] = (process, job, job_dump_dir, time.time())
+
+        time.sleep(0.1)
+
+        for name, (process, job, job_dump_dir, start_time) in list(running.items()):
+            elapsed = time.time() - start_time
+            if process.is_alive():
+                if elapsed <= job.get('time-limit', args.time_limit): continue
+                stop_job(process)
+                status = 'timeout'
+            else:
+                status = None if process.exitcode == 0 else 'failed'
+            del running[name]
+
+            job_summary = {'name': name, 'domain': job['domain'], 'problem': job['problem'], 
+                           'status': status, 'exitcode': process.exitcode, 'wall-time-s': elapsed}
+            job_stats_file = os.path.join(job_dump_dir, 'job.json')
+            if os.path.exists(job_stats_file):
+                with open(job_stats_file, 'r') as f:
+                    job_summary.update(json.load(f))
+            # A job that exits cleanly is only solved if it found plans, counting the behaviours finds none.
+            if status is None:
+                is_count = '--count-behaviours' in job.get('args', [])
+                status = job_summary['status'] = 'solved' if is_count or job_summary.get('plans', 0) > 0 else 'unsolved'
+            summary.append(job_summary)
+            print(f"{name}: {status} in {round(elapsed, 2)}s")
+
+    os.makedirs(args.dump_dir, exist_ok=True)
+    with open(os.path.join(args.dump_dir, 'batch.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -1,12 +1,12 @@
 import sys
-import json
-import os
 
 from unified_planning.io import PDDLReader
 
 from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidBehaviourIterative
+from behaviour_planning.over_domain_models.smt.fbi.planner.parallel_planner import ParallelForbidBehaviourIterative
 from .argparser import create_parser
-from .utilities import process_args
+from behaviour_planning.over_domain_models.smt.bss.utilities import Profiler
+from .utilities import process_args, dump_results
 
 def main(args=None):
     """
@@ -15,29 +15,38 @@ def main(args=None):
 
     if args is None: args = sys.argv[1:]
 
+    # Run a manifest of jobs.
+    if len(args) > 0 and args[0] == 'batch':
+        from .batch import batch_main
+        return batch_main(args[1:])
+    # Run a long-running planning service.
+    if len(args) > 0 and args[0] == 'serve':
+        from .serve import serve_main
+        return serve_main(args[1:])
+
     # Parse planner args
     parser = create_parser()
     args = parser.parse_args(args)
     bspace_cfg, planner_cfg = process_args(args)
     
+    profiler = Profiler()
     # Read the planning task.
-    task = PDDLReader().parse_problem(args.domain, args.problem)
-
-    fbi_planner = ForbidBehaviourIterative(task, bspace_cfg, planner_cfg)
-    plans = fbi_planner.plan(args.k)
-
-    if args.dump_dir:
-        plans_dirs = os.path.join(args.dump_dir, 'plans')
-        os.makedirs(plans_dirs, exist_ok=True)
-        for i, plan in enumerate(plans):
-            with open(os.path.join(plans_dirs, f'plan_{i}.sas'), 'w') as f:
-                f.write(str(plan))
-        
-        logs_dir = os.path.join(args.dump_dir, 'logs')
-        os.makedirs(logs_dir, exist_ok=True)
-        # Write to json file
-        with open(os.path.join(logs_dir, 'logs.json'), 'w') as f:
-            json.dump(fbi_planner.logs(), f)
+    with profiler.phase('pddl-parsing'):
+        task = PDDLReader().parse_problem(args.domain, args.problem)
+
+    if args.count_behaviours:
+        # The behaviours are enumerated on the dimensions' variables only.
+        fbi_planner = ForbidBehaviourIterative(task, bspace_cfg, planner_cfg, profiler=profiler)
+        plans = []
+        if fbi_planner.bspace is not None:
+            print(f'Behaviours: {fbi_planner.bspace.count_behaviours(fbi_planner.solver_timeout, fbi_planner.solver_memorylimit)}')
+    else:
+        planner_cls = ParallelForbidBehaviourIterative if planner_cfg.get('workers', 1) > 1 else ForbidBehaviourIterative
+        fbi_planner = planner_cls(task, bspace_cfg, planner_cfg, profiler=profiler)
+        plans = fbi_planner.plan(args.k)
+
+    if args.dump_dir: dump_results(args.dump_dir, plans, fbi_planner.logs())
+    if args.trace_file: profiler.dump_trace(args.trace_file)
     
 if __name__ == '__main__':
     main(sys.argv[1:])
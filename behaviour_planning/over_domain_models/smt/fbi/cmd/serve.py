@@ -0,0 +1,177 @@
+import gc
+import os
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidBehaviourIterative
+from behaviour_planning.over_domain_models.smt.fbi.planner.parallel_planner import ParallelForbidBehaviourIterative
+from behaviour_planning.over_domain_models.smt.bss.utilities import current_rss_mb
+from .argparser import create_parser
+from .utilities import process_args, dump_results
+
+def create_serve_parser():
+
+    parser = argparse.ArgumentParser(prog='pybehaviourplanning_domain_models serve',
+                                     description = "Runs a local planning service that keeps the behaviour spaces of recent problems alive",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument('--socket', help='Path of the Unix socket to listen on, requests are JSON lines')
+    address.add_argument('--port', type=int, help='Local HTTP port to listen on, requests are JSON POST bodies')
+    parser.add_argument('--max-entries', type=int, default=8, help='Number of live behaviour spaces to keep')
+    parser.add_argument('--max-memory', type=int, default=8000, help='Evict the least recently used behaviour spaces when the memory they took is above this limit in MB')
+
+    return parser
+
+class PlanningService:
+    """!
+    Keeps the planners (and their live behaviour spaces) of recent problems in an LRU, so a
+    request for more plans on the same problem continues from the live solver. Every entry is
+    charged with the RSS growth of the requests it served, the RSS itself rarely drops once a
+    planner is closed so it cannot tell whether evicting freed enough memory.
+    A request is a dict with the same keys as a batch job: config, domain, problem and optionally
+    k, q, args and dump-dir.
+    """
+    def __init__(self, max_entries=8, max_memory=8000):
+        self.max_entries = max_entries
+        self.max_memory  = max_memory
+        self.planners    = OrderedDict()
+        # The memory (MB) charged to every entry.
+        self.memory      = {}
+        # z3 contexts are not thread safe, so the requests are handled one at a time.
+        self.lock = threading.Lock()
+
+    def handle(self, request):
+        with self.lock:
+            try:
+                op = request.get('op', 'plan')
+                if op == 'plan':     return self.plan(request)
+                if op == 'stats':    return self.stats()
+                if op == 'evict':    return self.evict_all()
+                if op == 'shutdown': return {'status': 'ok', 'shutdown': True}
+                return {'status': 'error', 'error': f'Unknown op {op}.'}
+            # argparse exits on invalid arguments, this must not stop the service.
+            except (Exception, SystemExit) as e:
+                return {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+
+    def plan(self, request):
+        start_time = time.time()
+        assert 'k' in request, 'The request must set k.'
+        args = [request['config'], request['domain'], request['problem']]
+        if 'q' in request: args += ['-q', str(request['q'])]
+        args += request.get('args', [])
+        args = create_parser().parse_args(args)
+
+        key = self.key(args)
+        is_live = key in self.planners
+        start_rss = current_rss_mb()
+        if is_live:
+            self.planners.move_to_end(key)
+        else:
+            bspace_cfg, planner_cfg = process_args(args)
+            task = PDDLReader().parse_problem(args.domain, args.problem)
+            planner_cls = ParallelForbidBehaviourIterative if planner_cfg.get('workers', 1) > 1 else ForbidBehaviourIterative
+            self.planners[key] = planner_cls(task, bspace_cfg, planner_cfg)
+            self.memory[key]   = 0.0
+        fbi_planner = self.planners[key]
+
+        # The planner continues from the plans (and blocking clauses) it already has.
+        try:
+            plans = fbi_planner.plan(request['k'])[:request['k']]
+        finally:
+            self.memory[key] += max(0.0, current_rss_mb() - start_rss)
+            # A planner without a behaviour space (e.g., no seed plan) has nothing to continue from.
+            if fbi_planner.bspace is None: self.drop(key)
+        if request.get('dump-dir', None): dump_results(request['dump-dir'], plans, fbi_planner.logs())
+
+        response = {'status': 'ok', 'live': is_live, 'plans': [str(plan) for plan in plans],
+                    'behaviours': [plan.behaviour for plan in plans], 'time-s': time.time() - start_time}
+        if request.get('logs', False): response['logs'] = fbi_planner.logs()
+        self.evict()
+        return response
+
+    def key(self, args):
+        # Edited files must not hit a stale entry.
+        files = [args.plannercfg, args.domain, args.problem] + ([args.resource_file] if args.resource_file else [])
+        key = dict(vars(args), k=None, dump_dir=None, trace_file=None)
+        key['mtimes'] = [os.path.getmtime(f) for f in files]
+        return json.dumps(key, sort_keys=True)
+
+    def evict(self):
+        while len(self.planners) > self.max_entries or (len(self.planners) > 1 and sum(self.memory.values()) > self.max_memory):
+            self.drop(next(iter(self.planners)))
+        gc.collect()
+
+    def evict_all(self):
+        while len(self.planners) > 0:
+            self.drop(next(iter(self.planners)))
+        gc.collect()
+        return {'status': 'ok'}
+
+    def drop(self, key):
+        fbi_planner = self.planners.pop(key)
+        self.memory.pop(key, None)
+        fbi_planner.close()
+
+    def stats(self):
+        return {'status': 'ok', 'entries': len(self.planners), 'rss-mb': current_rss_mb(),
+                'memory-mb': list(self.memory.values()),
+                'plans': [len(fbi_planner.diverse_plans) for fbi_planner in self.planners.values()]}
+
+class UnixSocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if len(line.strip()) == 0: continue
+            response = self.server.service.handle(json.loads(line))
+            self.wfile.write((json.dumps(response) + '\n').encode())
+            self.wfile.flush()
+            if response.get('shutdown', False):
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+class HTTPHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request  = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        response = json.dumps(self.server.service.handle(request)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+        if request.get('op', 'plan') == 'shutdown': threading.Thread(target=self.server.shutdown).start()
+
+def request(address, payload):
+    """!
+    Sends a request to a service listening on a Unix socket and returns its response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(address)
+        client.sendall((json.dumps(payload) + '\n').encode())
+        return json.loads(client.makefile('r').readline())
+
+def serve_main(args):
+    parser = create_serve_parser()
+    args = parser.parse_args(args)
+
+    service = PlanningService(args.max_entries, args.max_memory)
+    if args.socket:
+        if os.path.exists(args.socket): os.remove(args.socket)
+        server = socketserver.ThreadingUnixStreamServer(args.socket, UnixSocketHandler)
+    else:
+        server = ThreadingHTTPServer(('127.0.0.1', args.port), HTTPHandler)
+    server.service = service
+    print(f"Listening on {args.socket or f'http://127.0.0.1:{args.port}'}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.evict_all()
+        if args.socket and os.path.exists(args.socket): os.remove(args.socket)
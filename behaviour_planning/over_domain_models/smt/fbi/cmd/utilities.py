@@ -1,12 +1,23 @@
+import os
 import json
+from copy import deepcopy
+from functools import lru_cache
 
-from behaviour_planning.over_domain_models.smt.shortcuts import GoalPredicatesOrdering, MakespanOptimalCostBound, ResourceCount
+from behaviour_planning.over_domain_models.smt.shortcuts import GoalPredicatesOrdering, MakespanOptimalCostBound, ResourceCount, ActionCost
+
+@lru_cache()
+def _read_planner_config(plannercfg):
+    with open(plannercfg, 'r') as f:
+        return json.load(f)
+
+def read_planner_config(plannercfg):
+    # The configuration is updated by the caller, so every caller gets its own copy.
+    return deepcopy(_read_planner_config(plannercfg))
 
 def process_args(args):
 
     # Read the planner's configuration file.
-    with open(args.plannercfg, 'r') as f:
-        cfg = json.load(f)
+    cfg = read_planner_config(args.plannercfg)
 
     planner_cfg = cfg['base-planner-cfg']
     bspace_cfg  = cfg['bspace-cfg']
@@ -14,14 +25,17 @@ def process_args(args):
     # process the arguments.
     dims = []
     if args.add_goal_ordering:
-        dims += [(GoalPredicatesOrdering, None)]
+        dims += [(GoalPredicatesOrdering, {'encoding': args.goal_ordering_encoding})]
 
     if args.add_resource_count:
         assert args.resource_file, "Resource file is required when adding resource count to the plan."
         dims += [(ResourceCount, args.resource_file)]
 
+    if args.add_action_cost:
+        dims += [(ActionCost, {'cost-buckets': args.cost_buckets} if args.cost_buckets else {})]
+
     if args.add_makespan:
-        dims += [(MakespanOptimalCostBound, {"disable_action_check": args.disable_action_check})]
+        dims += [(MakespanOptimalCostBound, {"disable_action_check": args.disable_action_check, "encoding": args.makespan_encoding})]
     
     # Update the bspace configuration to include the parsed resource file
     bspace_cfg['dims'] = dims
@@ -29,4 +43,29 @@ def process_args(args):
     # Update the planner's quality bound factor
     if args.q: bspace_cfg['quality-bound-factor'] = args.q
 
-    return bspace_cfg, planner_cfg
\ No newline at end of file
+    # Update the number of workers for the parallel planner
+    if args.workers: planner_cfg['workers'] = args.workers
+
+    # Validate the plans in the background and block the invalid ones if requested.
+    if args.validation_workers:
+        bspace_cfg['run-plan-validation'] = True
+        bspace_cfg['validation-workers']  = args.validation_workers
+    if args.block_invalid_plans: bspace_cfg['block-invalid-plans'] = True
+
+    # Keep the bodies of the blocked plans on disk.
+    if args.spill_plans_dir: bspace_cfg['spill-plans-dir'] = args.spill_plans_dir
+
+    return bspace_cfg, planner_cfg
+
+def dump_results(dump_dir, plans, logs):
+    plans_dirs = os.path.join(dump_dir, 'plans')
+    os.makedirs(plans_dirs, exist_ok=True)
+    for i, plan in enumerate(plans):
+        with open(os.path.join(plans_dirs, f'plan_{i}.sas'), 'w') as f:
+            f.write(str(plan))
+    
+    logs_dir = os.path.join(dump_dir, 'logs')
+    os.makedirs(logs_dir, exist_ok=True)
+    # Write to json file
+    with open(os.path.join(logs_dir, 'logs.json'), 'w') as f:
+        json.dump(logs, f)
@@ -0,0 +1,156 @@
+import os
+import sys
+import multiprocessing
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidBehaviourIterative, ForbidMode
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.makespan_optimal_cost_bound import MakespanOptimalCostBound
+from behaviour_planning.over_domain_models.smt.bss.utilities import Profiler
+
+class ParallelForbidBehaviourIterative(ForbidBehaviourIterative):
+    """!
+    FBI that splits the behaviour space into disjoint cubes over the dimensions' values and
+    runs the BEHAVIOUR mode of the cubes in worker processes. The workers are forked from this
+    planner, so they share its grounded and encoded behaviour space, and every cube is enumerated
+    under a guard literal assumption.
+    """
+    def __init__(self, task, bspace_cfg, planner_cfg, seedplan=None, profiler=None):
+        self.workers          = planner_cfg.get('workers', os.cpu_count())
+        self.cubes_per_worker = planner_cfg.get('cubes-per-worker', 4)
+        self.bspace_cfg  = bspace_cfg
+        self.planner_cfg = planner_cfg
+        # The plans count shared by the workers, only set in a worker.
+        self.plancount   = None
+        # The partition is kept across calls, so a call for more plans skips the cubes whose
+        # behaviours have all been merged.
+        self.cubes       = None
+        self.done_cubes  = set()
+        super().__init__(task, bspace_cfg, planner_cfg, seedplan, profiler)
+
+    def plan_stream(self, required_plancount = sys.maxsize):
+        # The seed plan is already there.
+        yield from self.diverse_plans[:required_plancount]
+        # Generate the behaviours in parallel.
+        yield from self.iterate_parallel(required_plancount)
+        # If we did not get enough diverse behaviours, then try to generate plans from those behaviours.
+        if (len(self.diverse_plans) < required_plancount) and (required_plancount != sys.maxsize):
+            yield from self.iterate(ForbidMode.PLAN, required_plancount)
+        # Attach the results of the background validation before the plans are used.
+        if self.bspace is not None: self.bspace.wait_validation()
+
+    def iterate_parallel(self, required_plancount):
+        """!
+        Generates the plans found by the workers as soon as their cubes are enumerated.
+        """
+        if self.bspace is None:
+            self.log_msg.append('Behaviour space could not be constructed.')
+            return
+
+        if self.cubes is None:
+            self.cubes = partition_behaviour_space(self.bspace.dims, self.workers*self.cubes_per_worker)
+            self.log_msg.append(f'The behaviour space has been partitioned into {len(self.cubes)} cube(s).')
+        cubes = [i for i in range(len(self.cubes)) if not i in self.done_cubes]
+        if len(cubes) == 0: return
+
+        # Workers are forked so they continue from this planner's behaviour space.
+        mp_context = multiprocessing.get_context('fork')
+        plancount  = mp_context.Value('i', len(self.diverse_plans))
+        executor   = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context, initializer=_init_worker, initargs=(self, plancount))
+        try:
+            futures = {executor.submit(_enumerate_cube, self.cubes[i], required_plancount): i for i in cubes}
+            for future in as_completed(futures):
+                try:
+                    plans_records, exhausted, log_msg, profile = future.result()
+                except Exception as e:
+                    self.log_msg.append(f'Enumerating the cube {self.cubes[futures[future]]} failed: {e}')
+                    continue
+                self.log_msg.extend(log_msg)
+                self.profiler.merge(profile)
+                is_merged = yield from self.merge(plans_records, required_plancount)
+                # A cube is only skipped later if none of its behaviours is left out.
+                if exhausted and is_merged: self.done_cubes.add(futures[future])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def merge(self, plans_records, required_plancount):
+        """!
+        Adds the plans found by a worker. Since the workers may overshoot k (they check the shared
+        counter before solving), plans are only added until we have the required plans. The
+        workers' behaviour spaces are forks of this one, so the records' actions are attached as
+        they are and their behaviours are interned from their signatures, without a solver call.
+        @return: False if some of the plans were left out.
+        """
+        behaviours = set(plan.behaviour for plan in self.diverse_plans)
+        for plan, signature in plans_records:
+            if len(self.diverse_plans) >= required_plancount: return False
+            behaviour = self.bspace.intern_behaviour(signature)
+            if behaviour in behaviours:
+                self.log_msg.append('Repeated behaviour generated.')
+                continue
+            plan = self.bspace.record_plan(self.bspace.plans_store.adopt(plan), behaviour)
+            # The workers do not validate their plans.
+            if not self.bspace.validate(plan): continue
+            behaviours.add(behaviour)
+            if self.update(plan): yield plan
+        return True
+
+    def has_budget(self, required_plancount):
+        if self.plancount is None: return super().has_budget(required_plancount)
+        return self.plancount.value < required_plancount
+
+    def update(self, plan):
+        if not super().update(plan): return False
+        if self.plancount is not None:
+            with self.plancount.get_lock():
+                self.plancount.value += 1
+        return True
+
+def partition_behaviour_space(dims, cubes_count):
+    """!
+    Splits the behaviour space into at most cubes_count disjoint cubes. The dimensions are split
+    in order, starting with the makespan, and the values of a dimension are grouped so the number
+    of cubes never goes beyond cubes_count.
+    @return cubes: A list of cubes, every cube is a list of (dimension name, values) pairs.
+    """
+    cubes = [[]]
+    for name, dim in sorted(dims.items(), key=lambda d: d[0] != MakespanOptimalCostBound.__name__):
+        values = dim.partition()
+        groups_count = min(len(values), cubes_count // len(cubes))
+        if len(values) == 0: continue
+        if groups_count < 2: break
+        groups = [values[i*len(values)//groups_count:(i+1)*len(values)//groups_count] for i in range(groups_count)]
+        cubes  = [cube + [(name, group)] for cube, group in product(cubes, groups)]
+    return cubes
+
+_worker_state = {}
+
+def _init_worker(fbi_planner, plancount):
+    # The planner is forked along with its behaviour space, the worker keeps its own copy.
+    fbi_planner.plancount = plancount
+    fbi_planner.profiler  = fbi_planner.bspace.profiler = Profiler()
+    # The validation threads are not forked, the plans are validated once they are merged.
+    fbi_planner.bspace.run_plan_validation = False
+    fbi_planner.bspace.validation_pipeline = None
+    # The spill file is shared with the other processes, the worker's plans stay in memory.
+    fbi_planner.bspace.plans_store.spill_dir = None
+    _worker_state['planner'] = fbi_planner
+
+def _enumerate_cube(cube, required_plancount):
+    fbi_planner = _worker_state['planner']
+    if fbi_planner.plancount.value >= required_plancount: return [], False, [], {'phases': {}, 'checks': []}
+    plans_count, log_count = len(fbi_planner.diverse_plans), len(fbi_planner.log_msg)
+    fbi_planner.assumptions = [fbi_planner.bspace.cube_guard(cube)]
+    try:
+        fbi_planner.core(ForbidMode.BEHAVIOUR, required_plancount)
+    finally:
+        fbi_planner.assumptions = []
+    # The enumeration stopped before k, so the cube has no behaviour left.
+    exhausted = fbi_planner.plancount.value < required_plancount
+    # z3 objects cannot leave the worker, the records are sent with their behaviours' signatures
+    # since the behaviours' ids are local to the worker.
+    plans_records = [(plan, fbi_planner.bspace.behaviour_signature(plan.behaviour)) for plan in fbi_planner.diverse_plans[plans_count:]]
+    profile = fbi_planner.profiler.logs(events=True)
+    # Every cube sends its own profile.
+    fbi_planner.profiler = fbi_planner.bspace.profiler = Profiler()
+    return plans_records, exhausted, [f'[cube {cube}] {msg}' for msg in fbi_planner.log_msg[log_count:]], profile
@@ -4,39 +4,43 @@ from collections import defaultdict
 
 from enum import Enum
 
-from unified_planning.shortcuts import OneshotPlanner, AnytimePlanner
-import unified_planning.engines.results as UPResults
-import up_symk
-
 import z3
 
-from behaviour_planning.over_domain_models.smt.shortcuts import BehaviourSpace, compute_behaviour_space_statistics
-
-
-# Create an enum for the different types of planning
-class PlanningType(Enum):
-    R2E  = 1
-    SMT  = 2
-    SYMK = 3
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.utilities import compute_behaviour_space_statistics, Profiler
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner, PlanningType
 
 class ForbidMode(Enum):
     BEHAVIOUR = 1
     PLAN      = 2
 
 class ForbidBehaviourIterative:
-    def __init__(self, task, bspace_cfg, planner_cfg):
+    def __init__(self, task, bspace_cfg, planner_cfg, seedplan=None, profiler=None):
         self.task   = task
         self.bspace = None
+        self.profiler = Profiler() if profiler is None else profiler
 
-        self.base_planner       = planner_cfg.get('base-planner', PlanningType.SYMK)
+        self.seed_planner       = SeedPlanner(planner_cfg)
         self.solver_timeout     = planner_cfg.get('solver-timeout-ms', 600000)
         self.solver_memorylimit = planner_cfg.get('solver-memorylimit-mb', 16000)
+        self.incremental_forbid = planner_cfg.get('incremental-forbid', True)
 
         self.log_msg = []
         self.diverse_plans = []
-        self.diverse_plans_actions_sequence = set()
+        # The digests of the plans' actions, see PlanRecord.actions_digest.
+        self.diverse_plans_digests = set()
+
+        # Bookkeeping for the incremental forbid mode: which plans/behaviours already
+        # have their blocking clauses asserted in the solver.
+        self.forbidden_plans_count = 0
+        self.forbidden_behaviours  = set()
+        self.within_behaviours_guards = 0
+        # Extra assumptions passed to every check (e.g., the guard of a cube).
+        self.assumptions = []
 
-        seedplan = self.solve(task)
+        with self.profiler.phase('seed-planning'):
+            seedplan = self.solve(task) if seedplan is None else seedplan
+        self.seedplan = seedplan
 
         if not seedplan is None:
             quality_bound_factor      = bspace_cfg.get('quality-bound-factor', 1.0)
@@ -44,7 +48,7 @@ class ForbidBehaviourIterative:
             assert bspace_cfg['upper-bound'] >= 1, 'The upper bound is less than or equal to zero.'
 
             # Construct the behaviour space
-            self.bspace = BehaviourSpace(task, bspace_cfg)
+            self.bspace = BehaviourSpace(task, bspace_cfg, self.profiler)
             # Add seed plan to the the list of generated behaviours.
             plan = self.bspace.plan_behaviour(seedplan)
             if plan is not None: self.update(plan)
@@ -55,15 +59,32 @@ class ForbidBehaviourIterative:
             self.log_msg.append('Seed plan could not be generated.')
 
     def plan(self, required_plancount = sys.maxsize):
+        for _ in self.plan_stream(required_plancount): pass
+        # The plans the background validation found invalid are not returned.
+        return [plan for plan in self.diverse_plans if getattr(plan, 'isvalid', True) is not False]
+
+    def plan_stream(self, required_plancount = sys.maxsize):
+        """!
+        Generates the diverse plans one by one, every plan is yielded (with its behaviour) as soon
+        as it is extracted from the behaviour space.
+        """
+        # The seed plan is already there.
+        yield from self.diverse_plans[:required_plancount]
         # Try to generate plans that are diverse in terms of behaviours.
-        self.core(ForbidMode.BEHAVIOUR, required_plancount)
+        yield from self.iterate(ForbidMode.BEHAVIOUR, required_plancount)
         # If we did not get enough diverse behaviours, then try to generate plans from those behaviours.
         if (len(self.diverse_plans) < required_plancount) and (required_plancount != sys.maxsize):
-            self.core(ForbidMode.PLAN, required_plancount)
-        return self.diverse_plans
+            yield from self.iterate(ForbidMode.PLAN, required_plancount)
+        # Attach the results of the background validation before the plans are used.
+        if self.bspace is not None: self.bspace.wait_validation()
     
     def core(self, forbid_mode, required_plancount):
+        for _ in self.iterate(forbid_mode, required_plancount): pass
 
+    def iterate(self, forbid_mode, required_plancount):
+        """!
+        Generates the plans found in the given forbid mode.
+        """
         if self.bspace is None:
             self.log_msg.append('Behaviour space could not be constructed.')
             return
@@ -71,63 +92,138 @@ class ForbidBehaviourIterative:
         if len(self.diverse_plans) == 0:
             self.log_msg.append('Seed plan invalidated the behaviour space.')
 
+        if self.incremental_forbid:
+            yield from self.iterate_incremental(forbid_mode, required_plancount)
+        else:
+            yield from self.iterate_assumptions(forbid_mode, required_plancount)
+        # Logged once per mode, not on every plan of the loop.
+        self.log_msg.append("Found {} till now: {}".format('behaviour(s)' if forbid_mode == ForbidMode.BEHAVIOUR else 'plan(s)', len(self.diverse_plans)))
+
+    def iterate_assumptions(self, forbid_mode, required_plancount):
+        """!
+        Passes the blocking clauses of all the plans and behaviours found so far as assumptions.
+        """
         behaviours_list = []
         plans_list      = []
 
         for plan in self.diverse_plans:
-            behaviours_list.append(plan.behaviour)
+            behaviours_list.append(self.bspace.behaviour_expression(plan.behaviour))
             plans_list.append(z3.Not(z3.And(plan._z3_plan), ctx=self.ctx))
 
         assumptions = []
         assumptions.append(z3.Not(z3.Or(behaviours_list), ctx=self.ctx) if forbid_mode == ForbidMode.BEHAVIOUR else z3.Or(behaviours_list))
         assumptions.extend(plans_list)
-        while self.bspace.is_satisfiable(assumptions, self.solver_timeout, self.solver_memorylimit) and (len(self.diverse_plans) < required_plancount):
+        assumptions.extend(self.assumptions)
+        while self.bspace.is_satisfiable(assumptions, self.solver_timeout, self.solver_memorylimit) and self.has_budget(required_plancount):
             # Extract plan from the behaviour space.
             plan = self.bspace.extract_plan()
+            # The plan failed validation and has been blocked.
+            if plan is None: continue
             # Update the diverse plan list and check that we don't have repeated plans.
-            self.update(plan)
+            is_new_plan = self.update(plan)
             # Append the behaviour to the list of behaviours.
             if forbid_mode == ForbidMode.BEHAVIOUR:
-                behaviours_list.append(plan.behaviour)
+                behaviours_list.append(self.bspace.behaviour_expression(plan.behaviour))
             # Update the our assumptions.
             assumptions = []
             assumptions.append(z3.Not(z3.Or(behaviours_list), ctx=self.ctx) if forbid_mode == ForbidMode.BEHAVIOUR else z3.Or(behaviours_list))
             plans_list.append(z3.Not(z3.And(plan._z3_plan), ctx=self.ctx))
+            self.bspace.spill_plan(plan)
             assumptions.extend(plans_list)
-            print("Found {} till now: {}".format('behaviour(s)' if forbid_mode == ForbidMode.BEHAVIOUR else 'plan(s)', len(self.diverse_plans)))
+            assumptions.extend(self.assumptions)
+            if is_new_plan: yield plan
+
+    def iterate_incremental(self, forbid_mode, required_plancount):
+        """!
+        Every blocking clause is asserted into the solver only once. The clauses are guarded 
+        by literals, so the assumptions passed to each check have a constant size and 
+        BEHAVIOUR/PLAN modes can still be switched.
+        """
+        self.forbid_plans_guard      = z3.Bool('fbi-forbid-plans', ctx=self.ctx)
+        self.forbid_behaviours_guard = z3.Bool('fbi-forbid-behaviours', ctx=self.ctx)
+
+        # Block whatever we have found so far (e.g., the seed plan).
+        self.forbid()
+
+        assumptions = [self.forbid_plans_guard] + self.assumptions
+        if forbid_mode == ForbidMode.BEHAVIOUR:
+            assumptions.append(self.forbid_behaviours_guard)
+        else:
+            # Restrict the search to the behaviours we already have, this needs a fresh
+            # guard since the list of behaviours may grow between calls.
+            self.within_behaviours_guards += 1
+            within_behaviours_guard = z3.Bool(f'fbi-within-behaviours-{self.within_behaviours_guards}', ctx=self.ctx)
+            behaviours_list = [self.bspace.behaviour_expression(b) for b in sorted(set(plan.behaviour for plan in self.diverse_plans))]
+            within_behaviours = z3.Or(behaviours_list) if len(behaviours_list) > 0 else z3.BoolVal(False, ctx=self.ctx)
+            self.bspace.solver.add(z3.Implies(within_behaviours_guard, within_behaviours))
+            assumptions.append(within_behaviours_guard)
+
+        while self.has_budget(required_plancount) and self.bspace.is_satisfiable(assumptions, self.solver_timeout, self.solver_memorylimit):
+            # Extract plan from the behaviour space.
+            plan = self.bspace.extract_plan()
+            # The plan failed validation and has been blocked.
+            if plan is None: continue
+            # Update the diverse plan list and check that we don't have repeated plans.
+            is_new_plan = self.update(plan)
+            # A repeated plan has the actions of a plan we have at other steps, it has to be blocked
+            # too or it is found again.
+            if not is_new_plan: self.forbid_plan(plan)
+            # Assert the blocking clauses of the new plan (and its behaviour).
+            self.forbid()
+            if is_new_plan: yield plan
+
+    def has_budget(self, required_plancount):
+        return len(self.diverse_plans) < required_plancount
+
+    def forbid(self):
+        """!
+        Asserts the blocking clauses for the plans and behaviours that are not blocked yet.
+        """
+        with self.profiler.phase('forbid'):
+            for plan in self.diverse_plans[self.forbidden_plans_count:]:
+                self.forbid_plan(plan)
+                # The plan is blocked, its body can go to disk.
+                self.bspace.spill_plan(plan)
+                if plan.behaviour in self.forbidden_behaviours: continue
+                self.forbidden_behaviours.add(plan.behaviour)
+                self.bspace.solver.add(z3.Implies(self.forbid_behaviours_guard, z3.Not(self.bspace.behaviour_expression(plan.behaviour), ctx=self.ctx)))
+            self.forbidden_plans_count = len(self.diverse_plans)
+
+    def forbid_plan(self, plan):
+        self.bspace.solver.add(z3.Implies(self.forbid_plans_guard, z3.Not(z3.And(plan._z3_plan), ctx=self.ctx)))
 
     def solve(self, task):
-        if isinstance(self.base_planner, str): self.base_planner = eval(self.base_planner)
-        seedplan      = None
-        plannername   = 'symk-opt' #if self.base_planner == PlanningType.SYMK else 'SMTPlanner'
-        plannerparams = {}
-
-        match self.base_planner:
-            case PlanningType.SYMK:
-                plannerparams.update({'symk_search_time_limit': '900s'})
-            # case PlanningType.R2E:
-            #     plannerparams.update({'modifier': 'ModifierType.NA', 'encoder': 'EncoderType.R2E', 'upper_bound': 1000})
-            # case PlanningType.SMT:
-            #     plannerparams.update({'modifier': 'ModifierType.LINEAR', 'encoder': 'EncoderType.SMT', 'upper_bound': 1000})
-            case _:
-                raise Exception("Unknown planning type {}".format(self.base_planner))
-            
-        with OneshotPlanner(name=plannername,  params=plannerparams) as planner:
-            result   = planner.solve(task)
-            seedplan = result.plan if result.status in UPResults.POSITIVE_OUTCOMES else None
+        seedplan = self.seed_planner.solve(task)
+        self.log_msg.extend(self.seed_planner.log_msg)
         return seedplan
     
     def update(self, plan):
         # Make sure that we did not get a repeated plan.
-        if plan.actions_sequence in self.diverse_plans_actions_sequence:
+        actions_digest = plan.actions_digest
+        if actions_digest in self.diverse_plans_digests:
             self.log_msg.append('Repeated plan generated.')
-            return
-        self.diverse_plans_actions_sequence.add(plan.actions_sequence)
+            return False
+        self.diverse_plans_digests.add(actions_digest)
         self.diverse_plans.append(plan)
+        return True
+
+    def close(self):
+        """!
+        Frees the behaviour space, the plans found so far are kept.
+        """
+        if self.bspace is not None: self.bspace.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
 
     def logs(self):
         ret_logs = {}
         ret_logs['fbi-logs']     = self.log_msg
+        ret_logs['profile']      = self.profiler.logs()
         ret_logs['bspace-logs']  = self.bspace.logs() if self.bspace is not None else 'bspace is None.'
         ret_logs['bspace-stats'] = compute_behaviour_space_statistics(self.diverse_plans, self.bspace)
         return ret_logs
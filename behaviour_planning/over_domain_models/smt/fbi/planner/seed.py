@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import hashlib
+
+from enum import Enum
+
+from unified_planning.shortcuts import OneshotPlanner
+import unified_planning.engines.results as UPResults
+
+from behaviour_planning.over_domain_models.smt.fbi.planner.utilities import plan_to_actions_records, plan_from_actions_records
+
+# Create an enum for the different types of planning
+class PlanningType(Enum):
+    R2E  = 1
+    SMT  = 2
+    SYMK = 3
+    SATISFICING = 4
+
+def parse_planning_type(planning_type):
+    # The configuration files use 'PlanningType.SYMK' or 'SYMK'.
+    if isinstance(planning_type, str): return PlanningType[planning_type.split('.')[-1]]
+    return planning_type
+
+class SeedPlanner:
+    """!
+    Computes the seed plan of FBI. The seed plans are cached on disk keyed by the task's hash, 
+    otherwise the configured planners are tried in order within a time budget.
+    """
+    def __init__(self, planner_cfg):
+        base_planner = planner_cfg.get('base-planner', PlanningType.SYMK)
+        base_planner = base_planner if isinstance(base_planner, list) else [base_planner]
+        self.planners    = [parse_planning_type(p) for p in base_planner]
+        self.time_budget = planner_cfg.get('seed-time-budget', 900)
+        self.cache_dir   = planner_cfg.get('seed-cache-dir', None)
+        self.satisficing_planner = planner_cfg.get('seed-satisficing-planner', 'symk')
+        self.smt_max_horizon     = planner_cfg.get('seed-smt-max-horizon', 100)
+        self.log_msg = []
+
+    def solve(self, task):
+        seedplan = self.load(task)
+        if seedplan is not None:
+            self.log_msg.append('Seed plan loaded from the cache.')
+            return seedplan
+
+        deadline = time.time() + self.time_budget
+        for planning_type in self.planners:
+            time_budget = deadline - time.time()
+            if time_budget <= 0:
+                self.log_msg.append('Seed planning ran out of time.')
+                break
+            match planning_type:
+                case PlanningType.SYMK:
+                    seedplan = self.solve_oneshot(task, 'symk-opt', time_budget)
+                case PlanningType.SATISFICING:
+                    seedplan = self.solve_oneshot(task, self.satisficing_planner, time_budget)
+                case PlanningType.SMT:
+                    seedplan = self.solve_smt(task, time_budget)
+                case _:
+                    raise Exception("Unknown planning type {}".format(planning_type))
+            if seedplan is not None:
+                self.log_msg.append(f'Seed plan generated by {planning_type.name}.')
+                self.store(task, seedplan)
+                return seedplan
+            self.log_msg.append(f'{planning_type.name} could not generate a seed plan.')
+        return None
+
+    def solve_oneshot(self, task, plannername, time_budget):
+        plannerparams = {}
+        if plannername.startswith('symk'):
+            import up_symk
+            # symk reads a time limit of 0s as no time at all.
+            plannerparams.update({'symk_search_time_limit': f'{max(1, int(time_budget))}s'})
+        with OneshotPlanner(name=plannername,  params=plannerparams) as planner:
+            result = planner.solve(task, timeout=time_budget)
+            return result.plan if result.status in UPResults.POSITIVE_OUTCOMES else None
+
+    def solve_smt(self, task, time_budget):
+        """!
+        Incremental SMT search on the encoder: the formula is extended one step at a time and 
+        checked with the goal of the last step as an assumption.
+        """
+        import z3
+        from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.linear_formula_encoder import EncoderSequential
+        deadline = time.time() + time_budget
+        encoder  = EncoderSequential(task)
+        try:
+            solver = z3.Solver(ctx=encoder.ctx)
+            for horizon in range(1, self.smt_max_horizon+1):
+                time_budget = deadline - time.time()
+                if time_budget <= 0: return None
+                solver.add(encoder.encode_steps(horizon-1, horizon))
+                solver.add(encoder.encode_step_execution_semantics(horizon-1, False))
+                solver.set('timeout', int(time_budget*1000))
+                result = solver.check(encoder.goal_states[horizon-1])
+                if result == z3.sat:
+                    return encoder.extract_plan(solver.model(), horizon-1).plan
+                if result == z3.unknown: return None
+            return None
+        finally:
+            # The seed plan is a UP plan, the encoder's formulas and context can be freed.
+            solver = None
+            encoder.close()
+
+    def cache_file(self, task):
+        return os.path.join(self.cache_dir, f'{hashlib.sha256(str(task).encode()).hexdigest()}.json')
+
+    def load(self, task):
+        if self.cache_dir is None or not os.path.exists(self.cache_file(task)): return None
+        try:
+            with open(self.cache_file(task), 'r') as f:
+                return plan_from_actions_records(task, json.load(f))
+        except Exception as e:
+            self.log_msg.append(f'The cached seed plan could not be loaded: {e}')
+            return None
+
+    def store(self, task, seedplan):
+        if self.cache_dir is None: return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.cache_file(task), 'w') as f:
+            json.dump(plan_to_actions_records(seedplan), f)
@@ -0,0 +1,11 @@
+from unified_planning.plans import SequentialPlan, ActionInstance
+
+def plan_to_actions_records(plan):
+    """!
+    Converts a UP sequential plan to a list of (action name, [parameters names]) records, which
+    can be sent to other processes or dumped as JSON.
+    """
+    return [(a.action.name, [str(p) for p in a.actual_parameters]) for a in plan.actions]
+
+def plan_from_actions_records(task, actions_records):
+    return SequentialPlan([ActionInstance(task.action(name), [task.object(p) for p in params]) for name, params in actions_records])
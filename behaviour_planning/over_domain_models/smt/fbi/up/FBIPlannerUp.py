@@ -1,17 +1,17 @@
-from typing import Callable, IO, Optional
+import sys
+from typing import Callable, IO, Iterator, Optional
 import unified_planning as up
 
 from unified_planning.engines.results import PlanGenerationResultStatus as ResultStatus
 from unified_planning.engines.results import PlanGenerationResult
 
-from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidBehaviourIterative
-
 # We have to args: linear, upper_bound
-class FBIPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin):
+class FBIPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin, up.engines.mixins.AnytimePlannerMixin):
     def __init__(self, **options):
         # Read known user-options and store them for using in the `solve` method
         up.engines.Engine.__init__(self)
         up.engines.mixins.OneshotPlannerMixin.__init__(self)
+        up.engines.mixins.AnytimePlannerMixin.__init__(self)
 
         # Now we need to parse the options for the planner.
         # FBI requires two configurations (i) for the behaviour space and (ii) for the base planner.
@@ -58,17 +58,44 @@ class FBIPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin):
     def supports(problem_kind):
         return problem_kind <= FBIPlanner.supported_kind()
 
+    def create_planner(self, problem):
+        # The planner (z3, pypmt, ...) is only imported when a problem is solved, so registering
+        # the engine stays cheap.
+        from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidBehaviourIterative
+        return ForbidBehaviourIterative(problem, self.bspace_cfg, self.planner_cfg)
+
     def _solve(self, problem: 'up.model.Problem',
               callback: Optional[Callable[['up.engines.PlanGenerationResult'], None]] = None,
               timeout: Optional[float] = None,
               output_stream: Optional[IO[str]] = None) -> 'up.engines.PlanGenerationResult':
         
-        fbi_planner = ForbidBehaviourIterative(problem, self.bspace_cfg, self.planner_cfg)
-        plans = fbi_planner.plan(self.k) if self.k else fbi_planner.plan()
+        fbi_planner = self.create_planner(problem)
+        plans = []
+        for plan in fbi_planner.plan_stream(self.k if self.k else sys.maxsize):
+            plans.append(plan)
+            if callback is not None: callback(PlanGenerationResult(ResultStatus.INTERMEDIATE, plan.plan, self.name))
 
         if len(plans) > 0:
             return ([PlanGenerationResult(ResultStatus.SOLVED_SATISFICING, plan.plan, self.name) for plan in plans], fbi_planner.logs())
         return PlanGenerationResult(ResultStatus.UNSOLVABLE_INCOMPLETELY, None, self.name, log_messages=[fbi_planner.logs()])
 
+    @staticmethod
+    def ensures(anytime_guarantee):
+        # The plans are diverse, their quality is not guaranteed to improve.
+        return False
+
+    def _get_solutions(self, problem: 'up.model.Problem',
+                       timeout: Optional[float] = None,
+                       output_stream: Optional[IO[str]] = None) -> Iterator['up.engines.PlanGenerationResult']:
+
+        fbi_planner = self.create_planner(problem)
+        plans_count = 0
+        for plan in fbi_planner.plan_stream(self.k if self.k else sys.maxsize):
+            plans_count += 1
+            yield PlanGenerationResult(ResultStatus.INTERMEDIATE, plan.plan, self.name)
+
+        if plans_count == 0:
+            yield PlanGenerationResult(ResultStatus.UNSOLVABLE_INCOMPLETELY, None, self.name, log_messages=[fbi_planner.logs()])
+
     def destroy(self):
         pass
\ No newline at end of file
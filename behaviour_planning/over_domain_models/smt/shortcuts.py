@@ -1,16 +1,57 @@
-from .bss.behaviour_features_library.base import DimensionConstructor
-from .bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
-from .bss.behaviour_features_library.makespan_optimal_cost_bound import MakespanOptimalCostBound
-from .bss.behaviour_features_library.resource_count import ResourceCount
+import importlib
 
-from .bss.behaviour_space.space_encoders.basic import BehaviourSpace
-from .bss.behaviour_count.behaviour_count import BehaviourCount
+# The modules are only imported when one of their names is used (PEP 562), importing the
+# shortcuts does not pay for z3, pypmt or up_symk.
+_lazy_names = {
+    'DimensionConstructor':     '.bss.behaviour_features_library.base',
+    'GoalPredicatesOrdering':   '.bss.behaviour_features_library.goal_predicate_ordering',
+    'MakespanOptimalCostBound': '.bss.behaviour_features_library.makespan_optimal_cost_bound',
+    'ResourceCount':            '.bss.behaviour_features_library.resource_count',
+    'ActionCost':               '.bss.behaviour_features_library.action_cost',
 
-from .bss.utilities import compute_behaviour_space_statistics
+    'BehaviourSpace':           '.bss.behaviour_space.space_encoders.basic',
+    'BehaviourCount':           '.bss.behaviour_count.behaviour_count',
+    'StreamingBehaviourCount':  '.bss.behaviour_count.streaming_behaviour_count',
 
-from .fbi.planner.planner import ForbidBehaviourIterative, PlanningType
-from .fbi.up.FBIPlannerUp import FBIPlanner
+    'compute_behaviour_space_statistics': '.bss.utilities',
 
-import unified_planning as up
-env = up.environment.get_environment()
-env.factory.add_engine('FBIPlanner', __name__, 'FBIPlanner')
+    'ForbidBehaviourIterative': '.fbi.planner.planner',
+    'PlanningType':             '.fbi.planner.seed',
+    'ParallelForbidBehaviourIterative': '.fbi.planner.parallel_planner',
+    'FBIPlanner':               '.fbi.up.FBIPlannerUp',
+}
+
+__all__ = list(_lazy_names.keys()) + ['register']
+
+# Using one of these names (including `import *`) means UP may be asked for FBIPlanner.
+_registering_names = ['FBIPlanner', 'ForbidBehaviourIterative']
+
+def __getattr__(name):
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_lazy_names[name], __package__), name)
+    globals()[name] = value
+    if name in _registering_names: register()
+    return value
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
+
+# Creating UP's environment imports every installed engine (e.g., up_symk) and UP's engines
+# package is slow to import, so importing the shortcuts does not create it. FBIPlanner is
+# registered on an environment that already exists, and when FBIPlanner or ForbidBehaviourIterative
+# is first used from the shortcuts. register() covers the other cases (e.g., a new Environment).
+# FBIPlannerUp only imports the planner when it solves a problem.
+import unified_planning.environment
+
+def register(env=None):
+    """!
+    Registers FBIPlanner in the factory of the given UP environment (UP's global environment
+    by default), registering it twice is a no-op.
+    """
+    if env is None: env = unified_planning.environment.get_environment()
+    if 'FBIPlanner' in env.factory.engines: return
+    env.factory.add_engine('FBIPlanner', f'{__package__}.fbi.up.FBIPlannerUp', 'FBIPlanner')
+
+if unified_planning.environment.GLOBAL_ENVIRONMENT is not None:
+    register(unified_planning.environment.GLOBAL_ENVIRONMENT)
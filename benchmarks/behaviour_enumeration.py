@@ -0,0 +1,65 @@
+"""
+Time to count all the behaviours of the suite's problems with the projected enumeration
+(BehaviourSpace.count_behaviours) and with a full FBI run in BEHAVIOUR mode, which extracts a
+plan for every behaviour. The exit code is 1 if the two counts differ.
+
+python benchmarks/behaviour_enumeration.py --output enumeration.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from copy import deepcopy
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative, GoalPredicatesOrdering, ResourceCount, PlanningType
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidMode
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the projected behaviour enumeration with FBI')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('-q', type=float, default=1.2, help='Quality bound factor')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+        assert seedplan is not None, 'No seed plan found.'
+
+        dims  = [(GoalPredicatesOrdering, {'encoding': 'precedence'})]
+        dims += [(ResourceCount, os.path.join(PROBLEMS_DIR, problem['resources']))] if 'resources' in problem else []
+        bspace_cfg  = {'dims': dims, 'quality-bound-factor': args.q}
+        planner_cfg = {'base-planner': [PlanningType.SYMK]}
+
+        with ForbidBehaviourIterative(task, deepcopy(bspace_cfg), planner_cfg, seedplan) as fbi_planner:
+            start_time = time.perf_counter()
+            enumerated = fbi_planner.bspace.count_behaviours()
+            enumeration_time = time.perf_counter() - start_time
+
+        with ForbidBehaviourIterative(task, deepcopy(bspace_cfg), planner_cfg, seedplan) as fbi_planner:
+            start_time = time.perf_counter()
+            fbi_planner.core(ForbidMode.BEHAVIOUR, sys.maxsize)
+            fbi_time = time.perf_counter() - start_time
+            fbi_behaviours = len(set(plan.behaviour for plan in fbi_planner.diverse_plans))
+
+        results[problem['name']] = {'enumerated-behaviours': enumerated, 'enumeration-s': enumeration_time,
+                                    'fbi-behaviours': fbi_behaviours, 'fbi-s': fbi_time, 'agree': enumerated == fbi_behaviours}
+        print(f"{problem['name']}: {enumerated} behaviours in {round(enumeration_time, 2)}s, FBI {fbi_behaviours} in {round(fbi_time, 2)}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r['agree'] for r in results.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Builds and closes many behaviour spaces in one process and checks that the RSS stays bounded,
+the exit code is 1 if the RSS grew more than --max-growth-mb after the warm-up spaces.
+
+python benchmarks/bspace_memory.py domain.pddl problem.pddl --iterations 500 --upper-bound 10
+"""
+import gc
+import os
+import sys
+import json
+import argparse
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+
+def current_rss_mb():
+    with open('/proc/self/statm', 'r') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def build_space(task, upper_bound):
+    bspace_cfg = {'upper-bound': upper_bound, 'dims': [(GoalPredicatesOrdering, None)]}
+    with BehaviourSpace(task, bspace_cfg) as bspace:
+        assert bspace.is_satisfiable(), 'The behaviour space is not satisfiable.'
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Check that closed behaviour spaces are freed')
+    parser.add_argument('domain', help='Path to PDDL domain file')
+    parser.add_argument('problem', help='Path to PDDL problem file')
+    parser.add_argument('--upper-bound', type=int, default=10, help='Upper bound of every behaviour space')
+    parser.add_argument('--iterations', type=int, default=500, help='Number of behaviour spaces to build')
+    parser.add_argument('--warmup', type=int, default=20, help='Number of behaviour spaces built before measuring')
+    parser.add_argument('--max-growth-mb', type=float, default=64.0, help='Allowed RSS growth after the warm-up')
+    parser.add_argument('--output', help='JSON file to write the RSS samples to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    task = PDDLReader().parse_problem(args.domain, args.problem)
+
+    samples = []
+    for i in range(args.warmup + args.iterations):
+        build_space(task, args.upper_bound)
+        gc.collect()
+        if i >= args.warmup - 1: samples.append(current_rss_mb())
+
+    results = {
+        'iterations': args.iterations,
+        'baseline-rss-mb': samples[0],
+        'final-rss-mb': samples[-1],
+        'max-rss-mb': max(samples),
+        'growth-mb': max(samples) - samples[0],
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(results, samples=samples), f, indent=2)
+
+    return 0 if results['growth-mb'] <= args.max_growth_mb else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,83 @@
+"""
+Encoding time of EncoderSequential with the step template and with the previous
+deepcopy/per-part substitution implementation of encode_step.
+
+python benchmarks/encode_time.py domain.pddl problem.pddl --upper-bound 50
+"""
+import sys
+import json
+import time
+import argparse
+from copy import deepcopy
+
+import z3
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.linear_formula_encoder import EncoderSequential
+
+def legacy_encode_step(self, t):
+    """!
+    encode_step before the step template: it deep-copies the formula at t=0 and substitutes
+    every part of the formula separately.
+    """
+    if t == 0:
+        self.base_encode()
+        return deepcopy(self.formula)
+    
+    self.create_variables(t+1)
+
+    list_substitutions = []
+    for key in self.up_actions_to_z3.keys():
+        list_substitutions.append((self.up_actions_to_z3[key][0], self.up_actions_to_z3[key][t]))
+    for key in self.up_fluent_to_z3.keys():
+        list_substitutions.append((self.up_fluent_to_z3[key][0], self.up_fluent_to_z3[key][t]))
+        list_substitutions.append((self.up_fluent_to_z3[key][1], self.up_fluent_to_z3[key][t + 1]))
+
+    encoded_formula = dict()
+    encoded_formula['initial'] = self.formula['initial']
+    encoded_formula['goal']    = z3.substitute(self.formula['goal'], list_substitutions)
+    encoded_formula['actions'] = z3.substitute(self.formula['actions'], list_substitutions)
+    encoded_formula['frame']   = z3.substitute(self.formula['frame'], list_substitutions)
+    encoded_formula['sem']     = z3.substitute(self.formula['sem'], list_substitutions)
+    return encoded_formula
+
+def time_encoding(task, upper_bound, encode_step):
+    _encode_step = EncoderSequential.encode_step
+    EncoderSequential.encode_step = encode_step
+    try:
+        start_time = time.perf_counter()
+        encoder = EncoderSequential(task)
+        grounding_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        encoder.encode(upper_bound)
+        encoding_time = time.perf_counter() - start_time
+    finally:
+        EncoderSequential.encode_step = _encode_step
+    return {
+        'grounded-actions': len(encoder.up_actions_to_z3),
+        'grounding-s': grounding_time,
+        'encoding-s': encoding_time,
+    }
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Time the step encoding of EncoderSequential')
+    parser.add_argument('domain', help='Path to PDDL domain file')
+    parser.add_argument('problem', help='Path to PDDL problem file')
+    parser.add_argument('--upper-bound', type=int, default=50, help='Number of steps to encode')
+    parser.add_argument('--output', help='JSON file to write the timings to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    task = PDDLReader().parse_problem(args.domain, args.problem)
+    results = {
+        'before': time_encoding(task, args.upper_bound, legacy_encode_step),
+        'after':  time_encoding(task, args.upper_bound, EncoderSequential.encode_step),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+"""
+Builds the behaviour spaces of the suite's problems once without and once from the encodings
+cache, reports the encoding and the cache load times, and checks that both spaces admit the same
+behaviours: the behaviours are enumerated and a plan is extracted for every behaviour. The exit
+code is 1 if the behaviours or the plans' lengths differ.
+
+python benchmarks/encodings_cache.py --upper-bound 15 --output cache.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def behaviours(task, bspace_cfg):
+    start_time = time.perf_counter()
+    with BehaviourSpace(task, dict(bspace_cfg)) as bspace:
+        build_time = time.perf_counter() - start_time
+        plans = {}
+        for behaviour in bspace.enumerate_behaviours():
+            plan = bspace.behaviour_plan(behaviour)
+            plans[bspace.behaviour_signature(behaviour)] = None if plan is None else len(plan.plan.actions)
+        return {'build-s': build_time, 'behaviours': len(plans)}, plans
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the behaviour spaces built with and without the encodings cache')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('--upper-bound', type=int, default=15, help='Number of steps to encode')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            bspace_cfg = {'upper-bound': args.upper_bound, 'dims': [(GoalPredicatesOrdering, None)], 'encodings-cache-dir': cache_dir}
+            miss, miss_plans = behaviours(task, bspace_cfg)
+            hit, hit_plans   = behaviours(task, bspace_cfg)
+        results[problem['name']] = {'miss': miss, 'hit': hit, 'agree': miss_plans == hit_plans}
+        print(f"{problem['name']}: {miss['behaviours']} behaviours, built in {round(miss['build-s'], 2)}s, loaded in {round(hit['build-s'], 2)}s, {'agree' if results[problem['name']]['agree'] else 'DISAGREE'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r['agree'] for r in results.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+Plan extraction time of EncoderSequential with the action variables index and with the previous
+implementation that looks up every action variable of every step in the model.
+
+python benchmarks/extract_time.py domain.pddl problem.pddl --upper-bound 30 --repeat 20
+"""
+import sys
+import json
+import time
+import argparse
+
+import z3
+
+from unified_planning.io import PDDLReader
+from unified_planning.plans import SequentialPlan, ActionInstance
+
+from behaviour_planning.over_domain_models.smt.shortcuts import BehaviourSpace, MakespanOptimalCostBound
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.smt_sequential_plan import SMTSequentialPlan
+
+def legacy_extract_plan(self, model, horizon):
+    """!
+    extract_plan before the action variables index.
+    """
+    plan = SequentialPlan([])
+    selected_actions_vars = []
+    actions_sequence = []
+    if not model: return plan
+    for t in range(0, horizon+1):
+        for action in self:
+            if z3.is_true(model[self.up_actions_to_z3[action.name][t]]):
+                plan.actions.append(ActionInstance(action))
+                selected_actions_vars.append(self.up_actions_to_z3[action.name][t])
+                actions_sequence.append(self.action_name_to_number[action.name])
+                break
+
+    for compilation_r in reversed(self.compilation_results):
+        plan = plan.replace_action_instances(compilation_r.map_back_action_instance)
+
+    return SMTSequentialPlan(plan, self.task, selected_actions_vars, '-'.join(actions_sequence))
+
+def time_extraction(extract_plan, encoder, model, horizon, repeat):
+    samples = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        plan = extract_plan(encoder, model, horizon)
+        samples.append(time.perf_counter() - start_time)
+    return plan, {'first-s': samples[0], 'mean-s': sum(samples) / len(samples)}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Time the plan extraction of EncoderSequential')
+    parser.add_argument('domain', help='Path to PDDL domain file')
+    parser.add_argument('problem', help='Path to PDDL problem file')
+    parser.add_argument('--upper-bound', type=int, default=30, help='Number of steps to encode')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of extractions of the same model')
+    parser.add_argument('--output', help='JSON file to write the timings to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    task = PDDLReader().parse_problem(args.domain, args.problem)
+    with BehaviourSpace(task, {'upper-bound': args.upper_bound}) as bspace:
+        assert bspace.check() == z3.sat, 'The behaviour space is unsatisfiable.'
+        model   = bspace.solver.model()
+        makespan = bspace.dims[MakespanOptimalCostBound.__name__]
+        horizon = makespan.discretize(makespan.value(model))
+
+        legacy_plan, legacy_times = time_extraction(legacy_extract_plan, bspace.encoder, model, horizon, args.repeat)
+        plan, times = time_extraction(type(bspace.encoder).extract_plan, bspace.encoder, model, horizon, args.repeat)
+        results = {
+            'grounded-actions': len(bspace.encoder.up_actions_to_z3),
+            'plan-length': len(plan.actions),
+            'before': legacy_times,
+            'after': times,
+            'same-plan': plan.actions_sequence == legacy_plan.actions_sequence and str(plan) == str(legacy_plan),
+        }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if results['same-plan'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""
+Per-iteration check time of FBI with and without incremental blocking clauses.
+
+It accepts the same arguments as pybehaviourplanning_domain_models, e.g.,
+python benchmarks/forbid_check_time.py plannercfg.json domain.pddl problem.pddl -k 1000 --add-makespan
+"""
+import sys
+import json
+import time
+import statistics
+from copy import deepcopy
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidBehaviourIterative
+from behaviour_planning.over_domain_models.smt.fbi.cmd.argparser import create_parser
+from behaviour_planning.over_domain_models.smt.fbi.cmd.utilities import process_args
+
+def time_checks(fbi_planner):
+    check_times = []
+    is_satisfiable = fbi_planner.bspace.is_satisfiable
+    def timed_is_satisfiable(*args, **kwargs):
+        start_time = time.perf_counter()
+        ret = is_satisfiable(*args, **kwargs)
+        check_times.append(time.perf_counter() - start_time)
+        return ret
+    fbi_planner.bspace.is_satisfiable = timed_is_satisfiable
+    return check_times
+
+def summarise(check_times, window=10):
+    if len(check_times) == 0: return {}
+    return {
+        'checks': len(check_times),
+        'total-s': sum(check_times),
+        'first-window-mean-s': statistics.mean(check_times[:window]),
+        'last-window-mean-s':  statistics.mean(check_times[-window:]),
+    }
+
+def main(args=None):
+    parser = create_parser()
+    parser.add_argument('--output', help='JSON file to write the per-iteration check times to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    results = {}
+    for incremental_forbid in [False, True]:
+        bspace_cfg, planner_cfg = process_args(args)
+        planner_cfg = deepcopy(planner_cfg)
+        planner_cfg['incremental-forbid'] = incremental_forbid
+        task = PDDLReader().parse_problem(args.domain, args.problem)
+        fbi_planner = ForbidBehaviourIterative(task, bspace_cfg, planner_cfg)
+        if fbi_planner.bspace is None: 
+            print('Behaviour space could not be constructed.')
+            return
+        check_times = time_checks(fbi_planner)
+        fbi_planner.plan(args.k) if args.k else fbi_planner.plan()
+        mode = 'incremental' if incremental_forbid else 'assumptions'
+        results[mode] = {'summary': summarise(check_times), 'check-times-s': check_times}
+        print(mode, json.dumps(results[mode]['summary'], indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
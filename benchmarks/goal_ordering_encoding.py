@@ -0,0 +1,65 @@
+"""
+Encoding time and behaviours found per second by FBI with the goal ordering dimension encoded
+with the uninterpreted function (uf) and with the Boolean precedence literals (precedence).
+The differences show on problems with large goal sets (30-50 goal atoms).
+
+python benchmarks/goal_ordering_encoding.py domain.pddl problem.pddl -k 20 --time-limit 300
+"""
+import sys
+import json
+import time
+import argparse
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative, GoalPredicatesOrdering, PlanningType
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidMode
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+
+def time_encoding(task, seedplan, encoding, args):
+    bspace_cfg  = {'dims': [(GoalPredicatesOrdering, {'encoding': encoding})], 'quality-bound-factor': args.q}
+    planner_cfg = {'base-planner': [PlanningType.SYMK]}
+
+    fbi_planner = ForbidBehaviourIterative(task, bspace_cfg, planner_cfg, seedplan)
+    phases = fbi_planner.profiler.logs()['phases']
+    goal_ordering = fbi_planner.bspace.dims['GoalPredicatesOrdering']
+
+    start_time = time.perf_counter()
+    for _ in fbi_planner.iterate(ForbidMode.BEHAVIOUR, args.k):
+        if time.perf_counter() - start_time > args.time_limit: break
+    planning_time = time.perf_counter() - start_time
+    behaviours = len(fbi_planner.diverse_plans)
+    fbi_planner.close()
+    return {
+        'orderings': len(goal_ordering.goal_predciates_vars),
+        'encodings': len(goal_ordering.encodings),
+        'dims-encoding-s': phases['dims-encoding']['wall-s'] if 'dims-encoding' in phases else None,
+        'behaviours': behaviours,
+        'planning-s': planning_time,
+        'behaviours-per-s': behaviours / planning_time if planning_time > 0 else None,
+    }
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the encodings of the goal ordering dimension')
+    parser.add_argument('domain', help='Path to PDDL domain file')
+    parser.add_argument('problem', help='Path to PDDL problem file')
+    parser.add_argument('-k', type=int, default=20, help='Number of behaviours to look for')
+    parser.add_argument('-q', type=float, default=1.0, help='Quality bound factor')
+    parser.add_argument('--time-limit', type=float, default=300, help='Planning time limit of every encoding in seconds')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    task = PDDLReader().parse_problem(args.domain, args.problem)
+    seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+    assert seedplan is not None, 'No seed plan found.'
+
+    results = {'goals': len(task.goals), 'seed-plan-length': len(seedplan.actions)}
+    results.update({encoding: time_encoding(task, seedplan, encoding, args) for encoding in ['uf', 'precedence']})
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
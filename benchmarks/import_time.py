@@ -0,0 +1,60 @@
+"""
+Cold-start time of the CLI and library entry points, every entry point is run in a fresh
+interpreter. With --baseline, the exit code is 1 if an entry point got slower than the baseline
+by more than --tolerance.
+
+python benchmarks/import_time.py --output import_time.json
+python benchmarks/import_time.py --baseline import_time.json
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ENTRY_POINTS = {
+    'python':          ['-c', 'pass'],
+    'shortcuts':       ['-c', 'import behaviour_planning.over_domain_models.smt.shortcuts'],
+    'behaviour-count': ['-c', 'from behaviour_planning.over_domain_models.smt.shortcuts import BehaviourCount'],
+    'planner':         ['-c', 'from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative'],
+    'up-registration': ['-c', 'from behaviour_planning.over_domain_models.smt.shortcuts import *; '
+                              'from unified_planning.shortcuts import get_environment; '
+                              'assert "FBIPlanner" in get_environment().factory.engines'],
+    'cli-help':        ['-m', 'behaviour_planning.over_domain_models.smt.fbi.cmd.bplanningcli', '--help'],
+}
+
+def time_entry_point(args, repeat):
+    samples = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable] + args, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start_time)
+    return {'median-s': statistics.median(samples), 'min-s': min(samples)}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Time the cold start of the entry points')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs of every entry point')
+    parser.add_argument('--output', help='JSON file to write the timings to')
+    parser.add_argument('--baseline', help='JSON file with the timings to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slow down against the baseline')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    results = {name: time_entry_point(entry_point, args.repeat) for name, entry_point in ENTRY_POINTS.items()}
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline: return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = [name for name in results if name in baseline and \
+                   results[name]['median-s'] > baseline[name]['median-s'] * (1 + args.tolerance)]
+    for name in regressions:
+        print(f"{name}: {round(results[name]['median-s'], 3)}s against {round(baseline[name]['median-s'], 3)}s")
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,64 @@
+"""
+Enumerates the behaviours of the suite's problems with the formula unrolled up to the upper bound
+and with the incremental horizon, and checks that both modes admit the same behaviours. The exit
+code is 1 if the behaviours of a problem differ.
+
+python benchmarks/incremental_horizon.py -q 1.2 --output horizon.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import PlanningType
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def enumerate_signatures(task, bspace_cfg):
+    with BehaviourSpace(task, bspace_cfg) as bspace:
+        start_time = time.perf_counter()
+        signatures = set(bspace.behaviour_signature(b) for b in bspace.enumerate_behaviours())
+        return signatures, time.perf_counter() - start_time
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the behaviours of the full and the incremental horizon')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('-q', type=float, default=1.2, help='Quality bound factor')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+        assert seedplan is not None, 'No seed plan found.'
+        # The same upper bound as FBI's.
+        upper_bound = int(math.floor(len(seedplan.actions)*args.q))
+
+        bspace_cfg = {'upper-bound': upper_bound, 'dims': [(GoalPredicatesOrdering, None)]}
+        full, full_time = enumerate_signatures(task, dict(bspace_cfg))
+        incremental, incremental_time = enumerate_signatures(task, dict(bspace_cfg, **{'incremental-horizon': True}))
+
+        results[problem['name']] = {'upper-bound': upper_bound,
+                                    'full-behaviours': len(full), 'full-s': full_time,
+                                    'incremental-behaviours': len(incremental), 'incremental-s': incremental_time,
+                                    'agree': full == incremental}
+        print(f"{problem['name']}: {len(full)} behaviours in {round(full_time, 2)}s, incremental {len(incremental)} in {round(incremental_time, 2)}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r['agree'] for r in results.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
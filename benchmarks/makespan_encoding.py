@@ -0,0 +1,71 @@
+"""
+Encoding time of the makespan dimension with the per-step sums ('sum') and with the step
+activity and done chain literals ('chain'), and whether both encodings admit the same behaviours:
+for every problem of the suite the behaviours of the space with the goal ordering and makespan
+dimensions are enumerated with both encodings, and a plan is extracted for every behaviour, its
+length must be the behaviour's makespan. The exit code is 1 if the encodings admit different
+behaviours or if a plan does not have the makespan of its behaviour.
+
+python benchmarks/makespan_encoding.py --upper-bound 20
+"""
+import os
+import sys
+import json
+import argparse
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import BehaviourSpace, GoalPredicatesOrdering, MakespanOptimalCostBound
+from behaviour_planning.over_domain_models.smt.bss.utilities import Profiler
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def behaviours(task, encoding, args):
+    bspace_cfg = {'dims': [(GoalPredicatesOrdering, {'encoding': 'precedence'}), (MakespanOptimalCostBound, {'encoding': encoding})], 'upper-bound': args.upper_bound}
+    profiler = Profiler()
+    with BehaviourSpace(task, bspace_cfg, profiler) as bspace:
+        makespan_index = list(bspace.dims).index(MakespanOptimalCostBound.__name__)
+        signatures  = set()
+        plans_match = True
+        for behaviour in bspace.enumerate_behaviours(limit=args.limit):
+            signature = bspace.behaviour_signature(behaviour)
+            signatures.add(signature)
+            plan = bspace.behaviour_plan(behaviour)
+            plans_match = plans_match and plan is not None and len(plan.plan.actions) == signature[makespan_index]
+        results = {
+            'dims-encoding-s': profiler.logs()['phases']['dims-encoding']['wall-s'],
+            'encodings': len(bspace.dims[MakespanOptimalCostBound.__name__].encodings),
+            'behaviours': len(signatures),
+            'plans-match': plans_match,
+        }
+    return results, signatures
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the encodings of the makespan dimension')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('--upper-bound', type=int, default=20, help='Number of steps to encode')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum number of behaviours to enumerate per encoding')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        results[problem['name']], signatures = {}, {}
+        for encoding in ['sum', 'chain']:
+            results[problem['name']][encoding], signatures[encoding] = behaviours(task, encoding, args)
+        # With a limit the encodings may stop at different behaviours, only the full enumerations are compared.
+        same_behaviours = args.limit is not None or signatures['sum'] == signatures['chain']
+        results[problem['name']]['agree'] = same_behaviours and all(results[problem['name']][e]['plans-match'] for e in signatures)
+        print(f"{problem['name']}: {results[problem['name']]['sum']['behaviours']} behaviours, {'agree' if results[problem['name']]['agree'] else 'DISAGREE'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r['agree'] for r in results.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
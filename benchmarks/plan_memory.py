@@ -0,0 +1,75 @@
+"""
+Python memory kept per plan by FBI in BEHAVIOUR mode with the plans' records in memory and with
+their bodies spilled to disk once they are blocked, along with the time to the k-th plan. The
+memory is traced by tracemalloc, so the solver's (native) memory is not counted.
+
+python benchmarks/plan_memory.py -k 1000 --output memory.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative, GoalPredicatesOrdering, PlanningType
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidMode
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def run_mode(task, seedplan, spill_dir, args):
+    bspace_cfg  = {'dims': [(GoalPredicatesOrdering, {'encoding': 'precedence'})], 'quality-bound-factor': args.q}
+    if spill_dir is not None: bspace_cfg['spill-plans-dir'] = spill_dir
+    planner_cfg = {'base-planner': [PlanningType.SYMK]}
+
+    with ForbidBehaviourIterative(task, bspace_cfg, planner_cfg, seedplan) as fbi_planner:
+        tracemalloc.start()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        # Every plan is a different plan, so k can go beyond the number of behaviours.
+        fbi_planner.core(ForbidMode.PLAN, args.k)
+        total_time = time.perf_counter() - start_time
+        plans_memory = tracemalloc.get_traced_memory()[0] - start_memory
+        tracemalloc.stop()
+        plans_count = len(fbi_planner.diverse_plans)
+        return {
+            'plans': plans_count,
+            'kth-plan-s': total_time,
+            'traced-bytes': plans_memory,
+            'traced-bytes-per-plan': plans_memory / max(1, plans_count),
+            'plans-store': fbi_planner.bspace.plans_store.stats(),
+        }
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Memory kept per plan with and without spilling the plans')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('-k', type=int, default=1000, help='Number of plans to generate')
+    parser.add_argument('-q', type=float, default=1.5, help='Quality bound factor')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+        assert seedplan is not None, 'No seed plan found.'
+        results[problem['name']] = {'in-memory': run_mode(task, seedplan, None, args)}
+        with tempfile.TemporaryDirectory() as spill_dir:
+            results[problem['name']]['spill'] = run_mode(task, seedplan, spill_dir, args)
+        for mode, r in results[problem['name']].items():
+            print(f"{problem['name']}/{mode}: {r['plans']} plans, {round(r['traced-bytes-per-plan'])} bytes per plan, {round(r['kth-plan-s'], 2)}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""
+Time to the k-th plan of FBI in BEHAVIOUR mode without plan validation, with the plans validated
+when they are extracted and with the plans validated by background workers, on the problems of
+the suite. The exit code is 1 if the two validation modes disagree on a plan.
+
+python benchmarks/plan_validation.py -k 20 --validation-workers 2 --output validation.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative, GoalPredicatesOrdering, PlanningType
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def run_mode(task, seedplan, validation_cfg, args):
+    bspace_cfg  = dict({'dims': [(GoalPredicatesOrdering, {'encoding': 'precedence'})], 'quality-bound-factor': args.q}, **validation_cfg)
+    planner_cfg = {'base-planner': [PlanningType.SYMK]}
+
+    with ForbidBehaviourIterative(task, bspace_cfg, planner_cfg, seedplan) as fbi_planner:
+        start_time = time.perf_counter()
+        plans = fbi_planner.plan(args.k)
+        total_time = time.perf_counter() - start_time
+        results = {
+            'plans': len(plans),
+            'kth-plan-s': total_time,
+            'validation': fbi_planner.bspace.validation_stats(),
+        }
+    return results, {plan.actions_sequence: plan.isvalid for plan in plans}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the synchronous and the background plan validation')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('-k', type=int, default=20, help='Number of plans to generate')
+    parser.add_argument('-q', type=float, default=1.2, help='Quality bound factor')
+    parser.add_argument('--validation-workers', type=int, default=2, help='Number of background validation threads')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    modes = {
+        'no-validation': {},
+        'sync': {'run-plan-validation': True},
+        'async': {'run-plan-validation': True, 'validation-workers': args.validation_workers},
+    }
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    agree = True
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+        assert seedplan is not None, 'No seed plan found.'
+        results[problem['name']] = {}
+        validity = {}
+        for mode, validation_cfg in modes.items():
+            results[problem['name']][mode], validity[mode] = run_mode(task, seedplan, validation_cfg, args)
+            print(f"{problem['name']}/{mode}: {round(results[problem['name']][mode]['kth-plan-s'], 2)}s")
+        # The modes may find different plans, they have to agree on the plans they share.
+        common_plans = set(validity['sync']) & set(validity['async'])
+        results[problem['name']]['agree'] = all(validity['sync'][p] == validity['async'][p] for p in common_plans)
+        agree = agree and results[problem['name']]['agree']
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if agree else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
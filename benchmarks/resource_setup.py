@@ -0,0 +1,73 @@
+"""
+Setup time of the ResourceCount dimension when every object of the problem is declared as a
+resource, with the action-parameter index and with the previous substring filter over the
+action names. It also reports the resources whose substring matches caught other objects'
+actions (e.g., truck1 and truck10).
+
+python benchmarks/resource_setup.py domain.pddl problem.pddl --upper-bound 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.linear_formula_encoder import EncoderSequential
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.resource_count import ResourceCount
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.resources import parse_resource_file
+
+def legacy_resources_actions(encoder, resources):
+    return {r: set(filter(lambda action: r in action, encoder.up_actions_to_z3.keys())) for r in resources}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Time the setup of the ResourceCount dimension')
+    parser.add_argument('domain', help='Path to PDDL domain file')
+    parser.add_argument('problem', help='Path to PDDL problem file')
+    parser.add_argument('--upper-bound', type=int, default=20, help='Number of steps to encode')
+    parser.add_argument('--output', help='JSON file to write the timings to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    task = PDDLReader().parse_problem(args.domain, args.problem)
+    resources = [o.name for o in task.all_objects]
+    with tempfile.NamedTemporaryFile('w', suffix='.pddl', delete=False) as f:
+        f.write('\n'.join(f'(:resource {r} 1 0 1)' for r in resources))
+        resources_file = f.name
+
+    try:
+        encoder = EncoderSequential(task)
+        encoder.encode(args.upper_bound)
+
+        start_time = time.perf_counter()
+        parse_resource_file(resources_file)
+        parsing_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        legacy_actions = legacy_resources_actions(encoder, resources)
+        legacy_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        dim = ResourceCount(encoder, resources_file)
+        setup_time = time.perf_counter() - start_time
+    finally:
+        os.remove(resources_file)
+
+    over_matched = [r for r in resources if len(legacy_actions[r] - dim.resources_actions.get(r, set())) > 0]
+    results = {
+        'resources': len(resources),
+        'grounded-actions': len(encoder.up_actions_to_z3),
+        'parsing-s': parsing_time,
+        'legacy-filter-s': legacy_time,
+        'setup-s': setup_time,
+        'over-matched-resources': over_matched,
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
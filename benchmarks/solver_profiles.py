@@ -0,0 +1,73 @@
+"""
+Time to the first and k-th plan of FBI in BEHAVIOUR mode with every solver profile on the
+problems of the suite, along with the profile's summed z3 statistics, and the profile the
+tuning mode picks for every problem.
+
+python benchmarks/solver_profiles.py -k 5 --output profiles.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative, GoalPredicatesOrdering, PlanningType
+from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidMode
+from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.solver_profiles import SOLVER_PROFILES
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+def run_profile(task, seedplan, profile, args):
+    bspace_cfg  = {'dims': [(GoalPredicatesOrdering, {'encoding': 'precedence'})], 'quality-bound-factor': args.q, 'solver-profile': profile}
+    planner_cfg = {'base-planner': [PlanningType.SYMK]}
+
+    fbi_planner = ForbidBehaviourIterative(task, bspace_cfg, planner_cfg, seedplan)
+    plans_times = []
+    start_time  = time.perf_counter()
+    for _ in fbi_planner.iterate(ForbidMode.BEHAVIOUR, args.k):
+        plans_times.append(time.perf_counter() - start_time)
+    results = {
+        'solver-profile': fbi_planner.bspace.solver_profile,
+        'plans': len(fbi_planner.diverse_plans),
+        'first-plan-s': plans_times[0] if len(plans_times) > 0 else None,
+        'kth-plan-s': plans_times[-1] if len(fbi_planner.diverse_plans) >= args.k else None,
+        'profiles': fbi_planner.profiler.profiles(),
+    }
+    fbi_planner.close()
+    return results
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Compare the solver profiles')
+    parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    parser.add_argument('-k', type=int, default=5, help='Number of plans to generate')
+    parser.add_argument('-q', type=float, default=1.0, help='Quality bound factor')
+    parser.add_argument('--profiles', nargs='+', default=list(SOLVER_PROFILES.keys()) + ['tune'], help='Solver profiles to run')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    args = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    results = {}
+    for problem in problems:
+        task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, problem['domain']), os.path.join(PROBLEMS_DIR, problem['problem']))
+        seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+        assert seedplan is not None, 'No seed plan found.'
+        results[problem['name']] = {}
+        for profile in args.profiles:
+            try:
+                results[problem['name']][profile] = run_profile(task, seedplan, profile, args)
+            except Exception as e:
+                results[problem['name']][profile] = {'error': f'{type(e).__name__}: {e}'}
+            print(f"{problem['name']}/{profile}: {results[problem['name']][profile].get('kth-plan-s', None)}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
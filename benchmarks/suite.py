@@ -0,0 +1,195 @@
+"""
+Benchmark suite over the PDDL problems bundled in benchmarks/problems. For every problem and
+dimensions combination it measures the seed planning time, the behaviour space encoding time,
+the time to the first and k-th plan in BEHAVIOUR and PLAN modes, the BehaviourCount throughput
+and the peak RSS. Every case runs in its own forked process.
+
+python benchmarks/suite.py run --output results.json
+python benchmarks/suite.py compare baseline.json results.json
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import platform
+import multiprocessing
+from copy import deepcopy
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'problems')
+
+DIMS_COMBINATIONS = {
+    'makespan':                    [],
+    'goal-ordering':               ['goal-ordering'],
+    'resource-count':              ['resource-count'],
+    'goal-ordering+resource-count': ['goal-ordering', 'resource-count'],
+}
+
+ENCODING_PHASES = ['grounding', 'step-encoding', 'dims-encoding', 'solver-add']
+
+def create_parser():
+    parser = argparse.ArgumentParser(description='Behaviour planning benchmark suite')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the suite')
+    run_parser.add_argument('--suite', default=os.path.join(PROBLEMS_DIR, 'suite.json'), help='JSON file with the problems')
+    run_parser.add_argument('--filter', default='', help='Only run the cases whose name contains this string')
+    run_parser.add_argument('--size', choices=['small', 'medium'], help='Only run the problems of this size')
+    run_parser.add_argument('-k', type=int, default=5, help='Number of plans to generate')
+    run_parser.add_argument('-q', type=float, default=1.0, help='Quality bound factor')
+    run_parser.add_argument('--count-plans', type=int, default=200, help='Number of plans scored by BehaviourCount')
+    run_parser.add_argument('--time-limit', type=float, default=600, help='Time limit of a case in seconds')
+    run_parser.add_argument('--output', help='JSON file to write the results to')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare results against a baseline')
+    compare_parser.add_argument('baseline', help='JSON file with the baseline results')
+    compare_parser.add_argument('results', help='JSON file with the new results')
+    compare_parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative regression')
+    compare_parser.add_argument('--min-seconds', type=float, default=0.05, help='Timings regressions below this many seconds are ignored')
+    return parser
+
+def plan_to_string(plan):
+    return '\n'.join(f"({' '.join([a.action.name] + [str(p) for p in a.actual_parameters])})" for a in plan.actions)
+
+def create_dims(dims_names, resources_file):
+    from behaviour_planning.over_domain_models.smt.shortcuts import GoalPredicatesOrdering, ResourceCount
+    dims = []
+    if 'goal-ordering' in dims_names:  dims += [(GoalPredicatesOrdering, None)]
+    if 'resource-count' in dims_names: dims += [(ResourceCount, resources_file)]
+    return dims
+
+def run_case(problem, dims_names, args):
+    from unified_planning.io import PDDLReader
+    from behaviour_planning.over_domain_models.smt.shortcuts import ForbidBehaviourIterative, BehaviourCount, PlanningType
+    from behaviour_planning.over_domain_models.smt.fbi.planner.planner import ForbidMode
+    from behaviour_planning.over_domain_models.smt.fbi.planner.seed import SeedPlanner
+
+    domain   = os.path.join(PROBLEMS_DIR, problem['domain'])
+    instance = os.path.join(PROBLEMS_DIR, problem['problem'])
+    resources_file = os.path.join(PROBLEMS_DIR, problem['resources']) if 'resources' in problem else None
+
+    metrics = {}
+    task = PDDLReader().parse_problem(domain, instance)
+
+    start_time = time.perf_counter()
+    seedplan = SeedPlanner({'base-planner': [PlanningType.SYMK]}).solve(task)
+    metrics['seed-s'] = time.perf_counter() - start_time
+    assert seedplan is not None, 'No seed plan found.'
+    metrics['seed-plan-length'] = len(seedplan.actions)
+
+    bspace_cfg  = {'dims': create_dims(dims_names, resources_file), 'quality-bound-factor': args.q}
+    planner_cfg = {'base-planner': [PlanningType.SYMK]}
+
+    plans = []
+    for mode in [ForbidMode.BEHAVIOUR, ForbidMode.PLAN]:
+        mode_name = mode.name.lower()
+        fbi_planner = ForbidBehaviourIterative(task, deepcopy(bspace_cfg), planner_cfg, seedplan)
+        phases = fbi_planner.profiler.logs()['phases']
+        metrics['encode-s'] = sum(phases[p]['wall-s'] for p in ENCODING_PHASES if p in phases)
+
+        # The seed plan is the first plan, the timings are for the plans found after it.
+        plans_times = []
+        start_time = time.perf_counter()
+        for _ in fbi_planner.iterate(mode, args.k):
+            plans_times.append(time.perf_counter() - start_time)
+        metrics[f'{mode_name}-plans'] = len(fbi_planner.diverse_plans)
+        metrics[f'{mode_name}-first-plan-s'] = plans_times[0] if len(plans_times) > 0 else None
+        metrics[f'{mode_name}-kth-plan-s']   = plans_times[-1] if len(fbi_planner.diverse_plans) >= args.k else None
+        metrics[f'{mode_name}-checks'] = len(fbi_planner.profiler.checks)
+        plans += [plan_to_string(plan.plan) for plan in fbi_planner.diverse_plans]
+        fbi_planner.close()
+
+    # Score a plan set of the requested size made of the plans we found.
+    planlist = [plans[i % len(plans)] for i in range(args.count_plans)]
+    start_time = time.perf_counter()
+    behaviour_count = BehaviourCount(domain, instance, deepcopy(bspace_cfg), planlist)
+    count_time = time.perf_counter() - start_time
+    metrics['behaviour-count'] = behaviour_count.count()
+    metrics['behaviour-count-s'] = count_time
+    metrics['behaviour-count-plans-per-s'] = len(planlist) / count_time
+    return metrics
+
+def _run_case_process(problem, dims_names, args, result_file):
+    try:
+        result = {'status': 'ok', 'metrics': run_case(problem, dims_names, args)}
+    except Exception as e:
+        result = {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+    result['peak-rss-mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with open(result_file, 'w') as f:
+        json.dump(result, f)
+
+def run_main(args):
+    with open(args.suite, 'r') as f:
+        problems = json.load(f)
+
+    mp_context = multiprocessing.get_context('fork')
+    results = {}
+    for problem in problems:
+        if args.size and problem.get('size', None) != args.size: continue
+        for dims_name, dims_names in DIMS_COMBINATIONS.items():
+            if 'resource-count' in dims_names and 'resources' not in problem: continue
+            name = f"{problem['name']}/{dims_name}"
+            if args.filter not in name: continue
+
+            result_file = os.path.join(os.getcwd(), f".suite-{os.getpid()}.json")
+            start_time = time.perf_counter()
+            process = mp_context.Process(target=_run_case_process, args=(problem, dims_names, args, result_file))
+            process.start()
+            process.join(args.time_limit)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                results[name] = {'status': 'timeout'}
+            elif os.path.exists(result_file):
+                with open(result_file, 'r') as f:
+                    results[name] = json.load(f)
+            else:
+                results[name] = {'status': 'error', 'error': f'exit code {process.exitcode}'}
+            if os.path.exists(result_file): os.remove(result_file)
+            results[name]['wall-s'] = time.perf_counter() - start_time
+            print(f"{name}: {results[name]['status']} in {round(results[name]['wall-s'], 2)}s")
+
+    report = {'meta': {'python': platform.python_version(), 'machine': platform.machine(), 'k': args.k, 'q': args.q,
+                       'count-plans': args.count_plans, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+def regressed(metric, base, new, args):
+    if not isinstance(base, (int, float)) or not isinstance(new, (int, float)): return False
+    if metric.endswith('-per-s'): return new < base * (1 - args.tolerance)
+    if metric.endswith('-s'):     return new > base * (1 + args.tolerance) and new - base > args.min_seconds
+    if metric == 'peak-rss-mb':   return new > base * (1 + args.tolerance)
+    return False
+
+def compare_main(args):
+    with open(args.baseline, 'r') as f: baseline = json.load(f)['results']
+    with open(args.results, 'r') as f:  results  = json.load(f)['results']
+
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline: continue
+        if baseline[name]['status'] == 'ok' and result['status'] != 'ok':
+            regressions.append((name, 'status', baseline[name]['status'], result['status']))
+            continue
+        base_metrics = dict(baseline[name].get('metrics', {}), **{'peak-rss-mb': baseline[name].get('peak-rss-mb', None)})
+        new_metrics  = dict(result.get('metrics', {}), **{'peak-rss-mb': result.get('peak-rss-mb', None)})
+        for metric, new in new_metrics.items():
+            if regressed(metric, base_metrics.get(metric, None), new, args):
+                regressions.append((name, metric, base_metrics[metric], new))
+
+    for name, metric, base, new in regressions:
+        print(f"{name} {metric}: {base} -> {new}")
+    print(f"{len(regressions)} regression(s) in {len(results)} case(s).")
+    return 1 if len(regressions) > 0 else 0
+
+def main(args=None):
+    args = create_parser().parse_args(sys.argv[1:] if args is None else args)
+    if args.command == 'run': return run_main(args)
+    return compare_main(args)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Behaviour spaces keep their encoder state per instance and are freed once they are closed.
+"""
+import gc
+import os
+
+import pytest
+
+pytest.importorskip('pypmt')
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.utilities import current_rss_mb
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'problems')
+
+WARMUP, ITERATIONS, MAX_GROWTH_MB = 10, 100, 32.0
+
+@pytest.fixture(scope='module')
+def task():
+    return PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, 'blocksworld', 'domain.pddl'), os.path.join(PROBLEMS_DIR, 'blocksworld', 'p01.pddl'))
+
+def build_space(task):
+    with BehaviourSpace(task, {'upper-bound': 8, 'dims': [(GoalPredicatesOrdering, None)]}) as bspace:
+        assert bspace.is_satisfiable()
+        return bspace
+
+def test_encoders_do_not_share_state(task):
+    first, second = BehaviourSpace(task, {'upper-bound': 8, 'dims': [(GoalPredicatesOrdering, None)]}), BehaviourSpace(task, {'upper-bound': 8, 'dims': [(GoalPredicatesOrdering, None)]})
+    try:
+        assert first.encoder.goal_states is not second.encoder.goal_states
+        assert first.encoder.assertions is not second.encoder.assertions
+        assert len(first.encoder.goal_states) == len(second.encoder.goal_states)
+    finally:
+        first.close(), second.close()
+
+def test_closed_space_is_freed(task):
+    bspace = build_space(task)
+    assert bspace.encoder is None and bspace.solver is None and len(bspace.dims) == 0
+
+def test_rss_is_bounded(task):
+    samples = []
+    for i in range(WARMUP + ITERATIONS):
+        build_space(task)
+        gc.collect()
+        if i >= WARMUP - 1: samples.append(current_rss_mb())
+    assert max(samples) - samples[0] <= MAX_GROWTH_MB, f'The RSS grew from {samples[0]}MB to {max(samples)}MB.'
@@ -0,0 +1,35 @@
+"""
+A behaviour space loaded from the encodings cache admits the same behaviours as the encoded one.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('pypmt')
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'problems')
+
+def behaviours(task, cache_dir):
+    bspace_cfg = {'upper-bound': 8, 'dims': [(GoalPredicatesOrdering, None)], 'encodings-cache-dir': cache_dir}
+    with BehaviourSpace(task, bspace_cfg) as bspace:
+        plans = {}
+        for behaviour in bspace.enumerate_behaviours():
+            plan = bspace.behaviour_plan(behaviour)
+            plans[bspace.behaviour_signature(behaviour)] = None if plan is None else len(plan.plan.actions)
+        goal_states = [goal.sexpr() for goal in bspace.encoder.goal_states]
+        loaded = any('loaded from the cache' in msg for msg in bspace.logs())
+    return plans, goal_states, loaded
+
+def test_cache_hit_matches_miss(tmp_path):
+    task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, 'blocksworld', 'domain.pddl'), os.path.join(PROBLEMS_DIR, 'blocksworld', 'p01.pddl'))
+    miss_plans, miss_goal_states, miss_loaded = behaviours(task, str(tmp_path))
+    hit_plans,  hit_goal_states,  hit_loaded  = behaviours(task, str(tmp_path))
+    assert not miss_loaded and hit_loaded
+    assert len(miss_plans) > 0
+    assert hit_plans == miss_plans
+    assert hit_goal_states == miss_goal_states
@@ -0,0 +1,25 @@
+"""
+The 'uf' and 'precedence' encodings of the goal ordering dimension admit the same behaviours.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('pypmt')
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'problems')
+
+def behaviours(task, encoding):
+    with BehaviourSpace(task, {'upper-bound': 8, 'dims': [(GoalPredicatesOrdering, {'encoding': encoding})]}) as bspace:
+        return set(bspace.behaviour_signature(b) for b in bspace.enumerate_behaviours())
+
+def test_uf_matches_precedence():
+    task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, 'blocksworld', 'domain.pddl'), os.path.join(PROBLEMS_DIR, 'blocksworld', 'p01.pddl'))
+    uf = behaviours(task, 'uf')
+    assert len(uf) > 0
+    assert behaviours(task, 'precedence') == uf
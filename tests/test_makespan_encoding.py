@@ -0,0 +1,35 @@
+"""
+The 'sum' and 'chain' encodings of the makespan dimension admit the same behaviours, and the plan
+of every behaviour has the behaviour's makespan.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('pypmt')
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.makespan_optimal_cost_bound import MakespanOptimalCostBound
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'problems')
+
+def behaviours(task, encoding):
+    bspace_cfg = {'upper-bound': 9, 'dims': [(GoalPredicatesOrdering, None), (MakespanOptimalCostBound, {'encoding': encoding})]}
+    with BehaviourSpace(task, bspace_cfg) as bspace:
+        makespan_index = list(bspace.dims).index(MakespanOptimalCostBound.__name__)
+        signatures = set()
+        for behaviour in bspace.enumerate_behaviours():
+            signature = bspace.behaviour_signature(behaviour)
+            plan = bspace.behaviour_plan(behaviour)
+            assert plan is not None and len(plan.plan.actions) == signature[makespan_index]
+            signatures.add(signature)
+        return signatures
+
+def test_sum_matches_chain():
+    task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, 'blocksworld', 'domain.pddl'), os.path.join(PROBLEMS_DIR, 'blocksworld', 'p01.pddl'))
+    chain = behaviours(task, 'chain')
+    assert len(chain) > 0
+    assert behaviours(task, 'sum') == chain
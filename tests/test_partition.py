@@ -0,0 +1,44 @@
+"""
+The cubes of the parallel planner's partition are disjoint and cover the behaviour space.
+"""
+from itertools import product
+
+import pytest
+
+pytest.importorskip('pypmt')
+
+from behaviour_planning.over_domain_models.smt.fbi.planner.parallel_planner import partition_behaviour_space
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.makespan_optimal_cost_bound import MakespanOptimalCostBound
+
+class Dimension:
+    # Only the partition of a dimension is used to split the space.
+    def __init__(self, values):
+        self.values = list(values)
+
+    def partition(self):
+        return self.values
+
+def dimensions():
+    return {
+        'GoalPredicatesOrdering': Dimension(range(3)),
+        MakespanOptimalCostBound.__name__: Dimension(range(5, 10)),
+        'Resources': Dimension([]),
+        'FunctionsDimension': Dimension(range(4)),
+    }
+
+def in_cube(point, cube):
+    return all(point[name] in values for name, values in cube)
+
+@pytest.mark.parametrize('cubes_count', [1, 2, 3, 5, 8, 16, 60, 1000])
+def test_cubes_cover_the_space_once(cubes_count):
+    dims  = dimensions()
+    cubes = partition_behaviour_space(dims, cubes_count)
+    assert 1 <= len(cubes) <= cubes_count
+    names = list(dims.keys())
+    for values in product(*[dims[name].partition() or [None] for name in names]):
+        point = dict(zip(names, values))
+        assert sum(in_cube(point, cube) for cube in cubes) == 1, f'{point} is not in exactly one cube.'
+
+def test_makespan_is_split_first():
+    cubes = partition_behaviour_space(dimensions(), 5)
+    assert all([name for name, _ in cube] == [MakespanOptimalCostBound.__name__] for cube in cubes)
@@ -0,0 +1,40 @@
+"""
+Plan records survive pickling and spilling their bodies to disk.
+"""
+import pickle
+from array import array
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.formula_encoders.plan_record import PlanRecord, PlanStore
+
+def record(store=None):
+    plan = PlanRecord([3, 1, 4, 1], [0, 1, 2, 5], store)
+    plan.id, plan.behaviour, plan.isvalid = 7, 2, True
+    return plan
+
+def test_pickle_round_trip():
+    plan = record()
+    copy = pickle.loads(pickle.dumps(plan))
+    assert copy.store is None
+    assert (copy.id, copy.behaviour, copy.isvalid) == (7, 2, True)
+    assert list(copy.actions) == [3, 1, 4, 1] and list(copy.steps) == [0, 1, 2, 5]
+    assert copy.actions_digest == plan.actions_digest
+
+def test_spill_round_trip(tmp_path):
+    store = PlanStore(None, None, str(tmp_path))
+    plans = [record(store), PlanRecord([2, 2], [0, 1], store)]
+    digests = [plan.actions_digest for plan in plans]
+    for plan in plans: store.spill(plan)
+    assert all(plan.body is None for plan in plans)
+    assert store.stats() == {'spilled-plans': 2, 'spilled-bytes': sum(2 * len(plan) * array('i').itemsize for plan in plans)}
+    assert list(plans[0].actions) == [3, 1, 4, 1] and list(plans[0].steps) == [0, 1, 2, 5]
+    assert list(plans[1].actions) == [2, 2] and list(plans[1].steps) == [0, 1]
+    assert [plan.actions_digest for plan in plans] == digests
+    # A spilled record is sent with its body, the receiver cannot read the spill file.
+    copy = pickle.loads(pickle.dumps(plans[0]))
+    assert copy.spill_offset is None and list(copy.actions) == [3, 1, 4, 1]
+
+def test_spilling_without_directory_keeps_the_body():
+    store = PlanStore(None, None)
+    plan  = record(store)
+    store.spill(plan)
+    assert plan.body is not None and store.stats()['spilled-plans'] == 0
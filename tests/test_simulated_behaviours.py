@@ -0,0 +1,36 @@
+"""
+The behaviours computed by simulating the plans are the behaviours the solver infers for them,
+for encoded spaces and for spaces loaded from the encodings cache.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('pypmt')
+
+from unified_planning.io import PDDLReader
+
+from behaviour_planning.over_domain_models.smt.bss.behaviour_space.space_encoders.basic import BehaviourSpace
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.goal_predicate_ordering import GoalPredicatesOrdering
+from behaviour_planning.over_domain_models.smt.bss.behaviour_features_library.makespan_optimal_cost_bound import MakespanOptimalCostBound
+
+PROBLEMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'problems')
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_simulation_matches_solver(tmp_path, cached):
+    task = PDDLReader().parse_problem(os.path.join(PROBLEMS_DIR, 'blocksworld', 'domain.pddl'), os.path.join(PROBLEMS_DIR, 'blocksworld', 'p01.pddl'))
+    bspace_cfg = {'upper-bound': 8, 'dims': [(GoalPredicatesOrdering, None), (MakespanOptimalCostBound, {})], 'encodings-cache-dir': str(tmp_path)}
+    if cached:
+        # Fill the cache, the space below is loaded from it.
+        with BehaviourSpace(task, dict(bspace_cfg)): pass
+
+    with BehaviourSpace(task, dict(bspace_cfg)) as bspace:
+        plans = [bspace.behaviour_plan(behaviour).plan for behaviour in bspace.enumerate_behaviours()]
+        assert len(plans) > 0
+        for i, plan in enumerate(plans):
+            simulated = bspace.simulate_plan_behaviour(plan, i)
+            solved    = bspace.plan_behaviour(plan, i)
+            assert simulated is not None and solved is not None
+            assert bspace.behaviour_signature(simulated.behaviour) == bspace.behaviour_signature(solved.behaviour)
+        # No dimension made the space fall back to the solver.
+        assert bspace.simulate_behaviours is True